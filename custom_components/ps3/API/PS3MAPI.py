@@ -1,14 +1,68 @@
+from __future__ import annotations
+
+import logging
 import asyncio
+import codecs
+import hashlib
 import aiohttp
-from bs4 import BeautifulSoup
+from contextlib import nullcontext
+from time import monotonic
+from types import MappingProxyType
 from urllib.parse import quote
 
 from . import endpoints
-from .exceptions import SensorError, RequestError, DeviceOffError, LockError
+from .batch import CommandBatch, MAX_URL_LENGTH
+from .exceptions import SensorError, RequestError, DeviceOffError
+from .scheduler import CommandQueue, Coalescer, NotificationQueue, PRIORITY_INTERACTIVE, PRIORITY_SETTING, PRIORITY_MEDIA, PRIORITY_POWER
+
+# webMAN serves one request at a time, so a small keep-alive pool is enough
+CONNECTION_LIMIT = 2
+KEEPALIVE_TIMEOUT = 60
+
+# Commands are queued instead of rejected while the console is busy
+QUEUE_SIZE = 16
+QUEUE_DEADLINE = 60
+
+# Setpoints arriving within this many seconds of each other only send the last value
+COALESCE_WINDOW = 0.5
+
+# At most one popup per interval, identical popups within the dedupe window are shown once
+NOTIFICATION_INTERVAL = 1.0
+NOTIFICATION_DEDUPE_WINDOW = 10.0
+
+# A bare TCP connect tells quickly whether the console is reachable at all
+PROBE_TIMEOUT = 0.5
+PROBE_CACHE_DURATION = 30
+
+# Slow commands are confirmed by reading the telemetry after this delay, growing by the factor up to the maximum
+CONFIRM_DELAY = 0.5
+CONFIRM_BACKOFF = 2
+CONFIRM_MAX_DELAY = 4
+
+# Pages are read in chunks of this many bytes when streaming
+STREAM_CHUNK_SIZE = 4096
+
+CONNECTION_ERRORS = (asyncio.TimeoutError, aiohttp.client_exceptions.ServerDisconnectedError, aiohttp.client_exceptions.ClientConnectorError)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def create_session(limit: int = CONNECTION_LIMIT, limit_per_host: int = 0) -> aiohttp.ClientSession:
+    """Keep-alive session for one console, or for many when limit_per_host is set."""
+    return aiohttp.ClientSession(
+        connector = aiohttp.TCPConnector(limit = limit, limit_per_host = limit_per_host, keepalive_timeout = KEEPALIVE_TIMEOUT)
+    )
+
 
 class PS3MAPIWrapper:
-    def __init__(self, ip: str):
+    def __init__(self, ip: str, session: aiohttp.ClientSession | None = None, coalesce_window: float = COALESCE_WINDOW, streaming: bool = False,
+                 merge_notifications: bool = False, throttle = None):
         self.ip = ip
+        # Returns an async context manager each read to confirm a command runs in, e.g. to share a limit on concurrent polls
+        self._throttle = throttle or nullcontext
+        self.streaming = streaming
+        self._session = session
+        self._owns_session = session is None
         self._state = None
         self._cpu_temp = None
         self._rsx_temp = None
@@ -17,159 +71,325 @@ class PS3MAPIWrapper:
         self._target_temp = None
         self._media_session = None
         self._games = None
+        self._game_names = None
+        self._game_images = {}
+        self._games_digest = None
+        self._games_validators = {}
         self._mounted_gamefile = None
-        self._fan_modes_mapping = {
-            'SYSCON': 'SYSCON',
-            'Manual': 'Manual',
-            'MAX': 'Dynamic',
-            'AUTO': 'Auto'
-        }
+        self._fan_modes_mapping = endpoints.FAN_MODES
         self._firmware_version = None
-        self._lock = asyncio.Lock()
+        self._mac_address = None
+        self._commands = CommandQueue(QUEUE_SIZE)
+        self._setpoints = Coalescer(coalesce_window)
+        self._notifications = NotificationQueue(
+            self._send_popup, interval = NOTIFICATION_INTERVAL, dedupe_window = NOTIFICATION_DEDUPE_WINDOW, merge = merge_notifications
+        )
         self._update_done = asyncio.Event()
+        self._update_listeners = []
+        self._closed = False
+        self._last_seen = None
 
-    def slow_server_request(evaluator, func_arg_idx = None, timeout = 30):
+    def slow_server_request(evaluator, func_arg_idx = None, timeout = 30, priority = PRIORITY_MEDIA):
         def decorator(func):
             async def wrapper(self, *args, **kwargs):
 
                 async def wait_with_timeout(self, evaluator, *func_args):
-                    while not evaluator(self, *func_args):
-                        await self._update_done.wait()
-
-                if self._lock.locked():
-                    raise LockError("Waiting for other request to complete")
-                
-                else:
-                    async with self._lock:
-                        await func(self, *args, **kwargs)
+                    # Read the telemetry until the command shows, unless another update gets there first
+                    delay = CONFIRM_DELAY
+                    while True:
                         try:
-                            if func_arg_idx is not None:
-                                await asyncio.wait_for(wait_with_timeout(self, evaluator, args[func_arg_idx]), timeout)
-                            else:
-                                await asyncio.wait_for(wait_with_timeout(self, evaluator), timeout)
+                            await asyncio.wait_for(self._update_done.wait(), delay)
                         except asyncio.TimeoutError:
-                            raise SensorError("Could not update sensors after request")
+                            try:
+                                async with self._throttle():
+                                    await self._update_status()
+                            except Exception as e:
+                                _LOGGER.debug("Could not read telemetry of %s while confirming a command: %s", self.ip, e)
+                            else:
+                                self._notify_update_listeners()
+                        if evaluator(self, *func_args):
+                            return
+                        delay = min(delay * CONFIRM_BACKOFF, CONFIRM_MAX_DELAY)
+
+                async def command():
+                    await func(self, *args, **kwargs)
+                    try:
+                        if func_arg_idx is not None:
+                            await asyncio.wait_for(wait_with_timeout(self, evaluator, args[func_arg_idx]), timeout)
+                        else:
+                            await asyncio.wait_for(wait_with_timeout(self, evaluator), timeout)
+                    except asyncio.TimeoutError:
+                        raise SensorError("Could not update sensors after request")
+
+                await self._commands.submit(command, priority = priority, deadline = QUEUE_DEADLINE)
 
             return wrapper
         return decorator
     
-    def fast_server_request():
+    def fast_server_request(priority = PRIORITY_SETTING):
         def decorator(func):
             async def wrapper(self, *args, **kwargs):
+                await self._commands.submit(lambda: func(self, *args, **kwargs), priority = priority, deadline = QUEUE_DEADLINE)
 
-                if self._lock.locked():
-                    raise LockError("Waiting for other request to complete")
-                
-                else:
-                    await func(self, *args, **kwargs)
+            return wrapper
+        return decorator
+
+    def coalesced_request(key):
+        def decorator(func):
+            async def wrapper(self, *args, **kwargs):
+                return await self._setpoints.submit(key, lambda: func(self, *args, **kwargs))
 
             return wrapper
         return decorator
 
-    async def _update(self):
-        endpoint_temps_fan = f"http://{self.ip}/cpursx.ps3"
+    def add_update_listener(self, listener) -> callable:
+        """Call listener after each update the wrapper makes on its own, e.g. to confirm a command. Returns a function removing it."""
+        self._update_listeners.append(listener)
+        return lambda: self._update_listeners.remove(listener)
+
+    def _notify_update_listeners(self):
+        for listener in list(self._update_listeners):
+            listener()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._closed:
+            raise RequestError("The connection to the console was closed")
+        if self._session is None or self._session.closed:
+            self._session = create_session()
+            self._owns_session = True
+        return self._session
+
+    async def _is_reachable(self) -> bool:
+        # Any successful response in the last PROBE_CACHE_DURATION seconds counts as reachable
+        if self._last_seen is not None and monotonic() - self._last_seen < PROBE_CACHE_DURATION:
+            return True
+
+        host, _, port = self.ip.partition(':')
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port or 80)), PROBE_TIMEOUT)
+        except (asyncio.TimeoutError, OSError):
+            return False
+
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        self._last_seen = monotonic()
+        return True
+
+    async def close(self):
+        self._closed = True
+        await self._notifications.close()
+        await self._setpoints.close()
+        await self._commands.close()
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _update_games(self, session: aiohttp.ClientSession):
         endpoint_games = f"http://{self.ip}/index.ps3"
 
+        # Let webMAN answer 304 when it supports conditional requests and the library did not change
+        headers = self._games_validators if self._games is not None else {}
+
+        async with session.get(endpoint_games, timeout = 5, headers = headers) as response:
+            if response.status == 304:
+                return
+            elif response.status == 200:
+                if not await self._stream_games(response):
+                    # Names and links did not pair up, read the page as a whole for the BeautifulSoup parser
+                    async with session.get(endpoint_games, timeout = 5) as full_response:
+                        body = await full_response.read()
+                    digest = hashlib.blake2b(body, digest_size = 16).digest()
+                    if digest != self._games_digest or self._games is None:
+                        self._parse_games(body.decode(full_response.get_encoding(), errors = 'replace'))
+                        self._games_digest = digest
+
+                self._games_validators = {
+                    header: response.headers[validator] 
+                    for header, validator in (('If-None-Match', 'ETag'), ('If-Modified-Since', 'Last-Modified')) 
+                    if validator in response.headers
+                }
+            else:
+                raise SensorError(f"Unexpected response code: {response.status}")
+
+    async def _update_telemetry(self, session: aiohttp.ClientSession, static_info: bool = False):
+        endpoint_temps_fan = f"http://{self.ip}/cpursx.ps3"
+
+        async with session.get(endpoint_temps_fan, timeout = 5) as response:
+            if response.status == 200:
+                self._last_seen = monotonic()
+                self._state = "On"
+                if self.streaming:
+                    await self._stream_telemetry(response, static_info)
+                else:
+                    self._parse_telemetry(await response.text(), static_info)
+            else:
+                self._clear_telemetry()
+                self._state = None
+                raise SensorError(f"Unexpected response code: {response.status}")
+
+    @staticmethod
+    async def _iter_text(response: aiohttp.ClientResponse):
+        # The charset is taken from the headers only, guessing it would need the whole body
+        decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors = 'replace')
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            yield chunk, decoder.decode(chunk)
+        yield b'', decoder.decode(b'', final = True)
+
+    async def _stream_games(self, response: aiohttp.ClientResponse) -> bool:
+        """Collect the games while the page arrives, so the page itself is never held in memory.
+        Returns False when the page could not be read incrementally."""
+        from .streaming import GameStreamParser
+
+        parser = GameStreamParser()
+        digest = hashlib.blake2b(digest_size = 16)
+        pending = {}
+
+        async for chunk, text in self._iter_text(response):
+            digest.update(chunk)
+            pending.update(parser.games(text))
+        pending.update(parser.close())
+
+        if not parser.complete:
+            return False
+
+        # The library page hardly ever changes, the games are only taken over when it did
+        if digest.digest() != self._games_digest or self._games is None:
+            if pending:
+                self._set_games(pending, parser.images)
+            self._games_digest = digest.digest()
+        return True
+
+    async def _stream_telemetry(self, response: aiohttp.ClientResponse, static_info: bool = False):
+        from .streaming import TelemetryStreamParser
+
+        parser = TelemetryStreamParser(static_info)
+
+        # Everything after the firmware link is of no interest, so stop reading there. The rest of the page
+        # is left unread, which makes aiohttp close the connection instead of keeping it alive for the next poll
+        async for _, text in self._iter_text(response):
+            parser.feed(text)
+            if parser.done:
+                break
+        else:
+            parser.close()
+
+        self._apply_telemetry(parser.telemetry(), static_info)
+
+    def _parse_games(self, html: str):
+        # The parsers compile their patterns on import, so they are only loaded with the first page
+        from .parsers import parse_games, parse_game_images
+
+        games = parse_games(html)
+        if games:
+            self._set_games(games, parse_game_images(html))
+
+    def _set_games(self, games: dict, images: dict | None = None):
+        # Read-only, so the same mappings can be shared by every snapshot until the library changes
+        self._games = MappingProxyType(games)
+        self._game_names = MappingProxyType({link: name for name, link in games.items()})
+        self._game_images = MappingProxyType(images or {})
+
+    def _parse_telemetry(self, html: str, static_info: bool = False):
+        from .parsers import parse_telemetry
+
+        self._apply_telemetry(parse_telemetry(html, static_info), static_info)
+
+    def _apply_telemetry(self, telemetry: dict, static_info: bool = False):
+        self._cpu_temp = telemetry['cpu_temp']
+        self._rsx_temp = telemetry['rsx_temp']
+        self._fan_speed = telemetry['fan_speed']
+        self._fan_mode = telemetry['fan_mode']
+        self._target_temp = telemetry['target_temp']
+        self._media_session = self._complete_media_session(telemetry['media_session'])
+        self._mounted_gamefile = telemetry['mounted_gamefile']
+
+        # Firmware and MAC address hardly ever change, only parse them when asked for
+        if static_info:
+            self._firmware_version = telemetry['firmware_version']
+            self._mac_address = telemetry['mac_address']
+
+    def _complete_media_session(self, media_session: dict | None) -> dict | None:
+        # Seconds and image URL are derived once per poll instead of on every state write
+        if media_session is None:
+            return None
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint_games, timeout = 5) as response:
-                    if response.status == 200:
-                        soup = BeautifulSoup(await response.text(), 'html.parser')
-                        game_names = soup.select('div[class="gn"] a')
-                        game_links = soup.select('div[class="ic"] a')
-                        if game_names and game_links:
-                            self._games = {name.text: link['href'] for name, link in zip(game_names, game_links)}
-                    else:
-                        self._games = None
-                        raise SensorError(f"Unexpected response code: {response.status}")
-                    
-                await asyncio.sleep(0)
-
-                async with session.get(endpoint_temps_fan, timeout = 5) as response:
-                    if response.status == 200:
-                        self._state = "On"
-                        soup = BeautifulSoup(await response.text(), 'html.parser')
-
-                        temperature_text = soup.find('a', class_='s', href = '/cpursx.ps3?up').text
-                        self._cpu_temp = float(temperature_text.split(': ')[1].split('°C')[0])
-                        self._rsx_temp = float(temperature_text.split(': ')[-1].split('°C')[0])
-                        fan_speed_text = soup.find('a', class_='s', href = '/cpursx.ps3?mode').text
-                        self._fan_speed = int(fan_speed_text.split(': ')[1].split('%')[0])
-
-                        for substring, fan_mode in self._fan_modes_mapping.items():
-                            if substring in temperature_text:
-                                self._fan_mode = fan_mode
-                                break
-                        else:
-                            raise SensorError("Fan mode sensor does not work")
-                        
-                        if self._fan_mode == 'Dynamic':
-                            self._target_temp = float(temperature_text.split(': ')[2].split('°C')[0])
-                        else:
-                            self._target_temp = None
-
-                        game_session_tags = soup.select('span[style="position:relative;top:-20px;"] h2 a')
-                        playback_state = soup.find('label', title = 'Play')
-                        if game_session_tags and playback_state:
-                            self._media_session = {'media_type': 'game', 
-                                                   'game_id': game_session_tags[0].text, 
-                                                   'game_title': game_session_tags[1].text, 
-                                                   'playback_time': playback_state.next_sibling, 
-                                                   'image': game_session_tags[2].find('img')['src']
-                                                   }
-                        elif playback_state:
-                            self._media_session = {'media_type': 'media', 'playback_time': playback_state.next_sibling}
-                        else:
-                            self._media_session = None
+            hours, minutes, seconds = media_session['playback_time'].split(':')
+            playback_seconds = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+        except (AttributeError, ValueError):
+            playback_seconds = None
 
-                        gamefile_tags = soup.select('font[size="3"] a')
-                        if gamefile_tags:
-                            self._mounted_gamefile = gamefile_tags[-1]['href']
-                        else:
-                            self._mounted_gamefile = None
-                        
-                        self._firmware_version = soup.find('a', class_ = "s", href="/setup.ps3").contents[0].split(': ')[-1]
-
-                    else:
-                        self._state = None
-                        self._cpu_temp = None
-                        self._rsx_temp = None
-                        self._fan_speed = None
-                        self._fan_mode = None
-                        self._target_temp = None
-                        self._media_session = None
-                        self._mounted_gamefile = None
-                        raise SensorError(f"Unexpected response code: {response.status}")
-                    
-            self._update_done.set()
-            self._update_done.clear()
-
-        except (asyncio.TimeoutError, aiohttp.client_exceptions.ServerDisconnectedError, aiohttp.client_exceptions.ClientConnectorError):
-            self._state = "Off"
-            self._cpu_temp = None
-            self._rsx_temp = None
-            self._fan_speed = None
-            self._fan_mode = None
-            self._target_temp = None
-            self._media_session = None
-            self._games = None
-            self._mounted_gamefile = None
+        image = media_session.get('image')
+        image_url = self.image_url(image) if image else None
 
-            self._update_done.set()
-            self._update_done.clear()
-        except SensorError:
-            raise
+        return {**media_session, 'playback_seconds': playback_seconds, 'image_url': image_url}
+
+    def image_url(self, path: str) -> str:
+        """URL of an image served by the console, paths from the pages are relative to its root."""
+        return f"http://{self.ip}/{path.lstrip('/')}"
+
+    def _clear_telemetry(self):
+        self._cpu_temp = None
+        self._rsx_temp = None
+        self._fan_speed = None
+        self._fan_mode = None
+        self._target_temp = None
+        self._media_session = None
+        self._mounted_gamefile = None
+
+    def _set_off(self):
+        self._last_seen = None
+        self._state = "Off"
+        self._clear_telemetry()
+
+    async def _update(self):
+        if await self._is_reachable():
+            session = self._get_session()
+
+            # Both pages are fetched concurrently; the telemetry page decides whether the console is reachable
+            games_result, telemetry_result = await asyncio.gather(
+                self._update_games(session), 
+                self._update_telemetry(session, static_info = True), 
+                return_exceptions = True
+            )
+
+            if isinstance(telemetry_result, CONNECTION_ERRORS):
+                self._set_off()
+            elif isinstance(telemetry_result, BaseException):
+                raise telemetry_result
+            elif isinstance(games_result, BaseException):
+                # Keep the last known library, the telemetry of this cycle is still valid
+                _LOGGER.debug("Could not update game library of %s: %s", self.ip, games_result)
+        else:
+            self._set_off()
+
+        self._update_done.set()
+        self._update_done.clear()
+
+    async def _update_status(self):
+        if await self._is_reachable():
+            try:
+                await self._update_telemetry(self._get_session())
+            except CONNECTION_ERRORS:
+                self._set_off()
+        else:
+            self._set_off()
+
+        self._update_done.set()
+        self._update_done.clear()
 
     async def _call_service(self, endpoint, timeout, **kwargs):
         try:
             endpoint_url = endpoint.format(ip = self.ip, **kwargs)
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint_url, timeout = timeout) as response:
-                    if response.status == 200:
-                        pass
-                    else:
-                        raise RequestError(f"Unexpected response code: {response.status}")
-        except (asyncio.TimeoutError, aiohttp.client_exceptions.ServerDisconnectedError, aiohttp.client_exceptions.ClientConnectorError):
+            async with self._get_session().get(endpoint_url, timeout = timeout) as response:
+                if response.status == 200:
+                    self._last_seen = monotonic()
+                else:
+                    raise RequestError(f"Unexpected response code: {response.status}")
+        except CONNECTION_ERRORS:
             raise DeviceOffError()
         except Exception:
             raise
@@ -178,17 +398,26 @@ class PS3MAPIWrapper:
         endpoint_mac = f"http://{self.ip}/cpursx.ps3"
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(endpoint_mac, timeout = 5) as response:
-                    if response.status == 200:
-                        soup = BeautifulSoup(await response.text(), 'html.parser')
-                        mac = soup.find(string = lambda mac: 'MAC Addr' in mac).split('MAC Addr : ')[-1].split(' - ')[0]
-                        return mac
-                    else:
-                        raise SensorError(f"Unexpected response code: {response.status}")
+            async with self._get_session().get(endpoint_mac, timeout = 5) as response:
+                if response.status == 200:
+                    from .parsers import parse_mac_address
+
+                    return parse_mac_address(await response.text())
+                else:
+                    raise SensorError(f"Unexpected response code: {response.status}")
         except SensorError:
             raise
 
+    def restore_library(self, games: dict | None, firmware_version: str | None, mac_address: str | None):
+        """Start from a library read earlier, e.g. from a cache, until the console is read again."""
+        if games is not None:
+            self._set_games(dict(games))
+        else:
+            self._games = None
+            self._game_names = None
+        self._firmware_version = firmware_version
+        self._mac_address = mac_address
+
     async def update(self):
         try:
             await self._update()
@@ -196,6 +425,14 @@ class PS3MAPIWrapper:
             raise
         except Exception as e:
             raise SensorError(e)
+
+    async def update_telemetry(self):
+        try:
+            await self._update_status()
+        except SensorError:
+            raise
+        except Exception as e:
+            raise SensorError(e)
         
     async def get_mac_address(self):
         try:
@@ -205,21 +442,26 @@ class PS3MAPIWrapper:
         except Exception as e:
             raise SensorError(e)
 
-    @fast_server_request()
-    async def send_notification(self, notification: str, icon: int = 1, sound: int = 1):
+    async def send_notification(self, notification: str, icon: int = 1, sound: int = 1) -> bool:
+        """Queue a popup. Returns False when an identical popup was shown or queued shortly before."""
+        return await self._notifications.submit(notification, icon, sound)
+
+    @fast_server_request(priority = PRIORITY_INTERACTIVE)
+    async def _send_popup(self, notification: str, icon: int = 1, sound: int = 1):
         notification_url = quote(notification)
         await self._call_service(endpoints.NOTIFICATION, timeout = 5, notification_url = notification_url, icon = icon, sound = sound)
 
     @fast_server_request()
     async def set_fan_mode(self, fan_mode: str):
-        url_substrings = {'SYSCON': 'fan=0', 'Manual': 'fan=1;/cpursx.ps3?man', 'Dynamic': 'fan=1;/cpursx.ps3?man;/cpursx.ps3?mode', 'Auto': 'fan=2'}
-        fan_mode_substring = url_substrings[fan_mode]
+        fan_mode_substring = endpoints.FAN_MODE_SUBSTRINGS[fan_mode]
         await self._call_service(endpoints.FAN_MODE, timeout = 5, fan_mode_substring = fan_mode_substring)
 
+    @coalesced_request('target_temp')
     @fast_server_request()
     async def set_target_temp(self, target_temp: float):
         await self._call_service(endpoints.TARGET_TEMP, timeout = 5, target_temp = target_temp)
 
+    @coalesced_request('fan_speed')
     @fast_server_request()
     async def set_fan_speed(self, fan_speed: int):
         await self._call_service(endpoints.FAN_SPEED, timeout = 5, fan_speed = fan_speed)
@@ -227,8 +469,6 @@ class PS3MAPIWrapper:
     @slow_server_request(evaluator = lambda self: self._media_session == None)
     async def quit_playback(self):
         await self._call_service(endpoints.QUIT_PLAYBACK, timeout = 30)
-        await asyncio.sleep(0)
-        await self._update()
 
     @slow_server_request(evaluator = lambda self: self._media_session != None)
     async def start_playback(self):
@@ -243,21 +483,33 @@ class PS3MAPIWrapper:
     async def mount_disc(self):
         await self._call_service(endpoints.MOUNT_DISC, timeout = 30)
     
-    @fast_server_request()
+    @fast_server_request(priority = PRIORITY_INTERACTIVE)
     async def press_button(self, button: str):
         await self._call_service(endpoints.PRESS_BUTTON, timeout = 5, button = button)
 
-    @fast_server_request()
+    @fast_server_request(priority = PRIORITY_POWER)
     async def shutdown(self):
         await self._call_service(endpoints.SHUTDOWN, timeout = 30)
 
+    def batch(self) -> CommandBatch:
+        return CommandBatch(self)
+
+    async def send_batch(self, batch: CommandBatch):
+        # Leave room for the scheme and host in front of the chained actions
+        requests = batch.split(MAX_URL_LENGTH - len(endpoints.BATCH.format(ip = self.ip, actions = "")))
+
+        async def command():
+            for actions in requests:
+                await self._call_service(endpoints.BATCH, timeout = 30, actions = actions)
+
+        if requests:
+            await self._commands.submit(command, priority = batch.priority, deadline = QUEUE_DEADLINE)
+
     async def wait_for_xmb(self):
         try:
             await self._call_service(endpoints.WAIT_FOR_XMB, timeout = 60)
-        except (asyncio.TimeoutError, aiohttp.client_exceptions.ClientConnectorError):
+        except DeviceOffError:
             raise RequestError("XMB not available")
-        except Exception:
-            raise
 
     @property
     def state(self):
@@ -295,10 +547,28 @@ class PS3MAPIWrapper:
     def games(self):
         return self._games
     
+    @property
+    def pending_commands(self) -> int:
+        return self._commands.pending
+
+    @property
+    def game_images(self):
+        """Cover art path on the console by game link, as listed on index.ps3."""
+        return self._game_images
+
+    @property
+    def game_names(self):
+        """Game names by link, the reverse of games."""
+        return self._game_names
+
     @property
     def mounted_gamefile(self):
         return self._mounted_gamefile
     
     @property
     def firmware_version(self):
-        return self._firmware_version
\ No newline at end of file
+        return self._firmware_version
+    
+    @property
+    def mac_address(self):
+        return self._mac_address
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from urllib.parse import quote
+
+from . import endpoints
+from .exceptions import RequestError
+from .scheduler import PRIORITY_INTERACTIVE, PRIORITY_SETTING, PRIORITY_MEDIA
+
+# Request lines longer than this are not accepted by webMAN
+MAX_URL_LENGTH = 1024
+
+# Characters webMAN needs to see unescaped to split and parse chained actions
+URL_SAFE_CHARACTERS = "/;?=&$%:"
+
+class CommandBatch:
+    """Builds several webMAN actions into as few requests as possible, e.g.
+
+        await wrapper.batch().fan_speed(40).notify("Fan set").beep().execute()
+    """
+
+    def __init__(self, wrapper):
+        self._wrapper = wrapper
+        self._actions = []
+        self.priority = PRIORITY_INTERACTIVE
+
+    def _add(self, action: str, priority: int) -> CommandBatch:
+        self._actions.append(action)
+        self.priority = max(self.priority, priority)
+        return self
+
+    def notify(self, message: str, icon: int = 1, sound: int = 1) -> CommandBatch:
+        return self._add(endpoints.ACTION_NOTIFICATION.format(notification_url = quote(message), icon = icon, sound = sound), PRIORITY_INTERACTIVE)
+
+    def press_button(self, button: str) -> CommandBatch:
+        return self._add(endpoints.ACTION_PRESS_BUTTON.format(button = button), PRIORITY_INTERACTIVE)
+
+    def beep(self, pattern: int = 1) -> CommandBatch:
+        return self._add(endpoints.ACTION_BEEP.format(pattern = pattern), PRIORITY_INTERACTIVE)
+
+    def fan_mode(self, fan_mode: str) -> CommandBatch:
+        if fan_mode not in endpoints.FAN_MODE_SUBSTRINGS:
+            raise RequestError(f"Unknown fan mode: {fan_mode}")
+        return self._add(endpoints.ACTION_FAN_MODE.format(fan_mode_substring = endpoints.FAN_MODE_SUBSTRINGS[fan_mode]), PRIORITY_SETTING)
+
+    def target_temp(self, target_temp: float) -> CommandBatch:
+        return self._add(endpoints.ACTION_TARGET_TEMP.format(target_temp = target_temp), PRIORITY_SETTING)
+
+    def fan_speed(self, fan_speed: int) -> CommandBatch:
+        return self._add(endpoints.ACTION_FAN_SPEED.format(fan_speed = fan_speed), PRIORITY_SETTING)
+
+    def exit_to_xmb(self) -> CommandBatch:
+        return self._add(endpoints.ACTION_EXIT_TO_XMB, PRIORITY_MEDIA)
+
+    def mount_gamefile(self, game: str) -> CommandBatch:
+        games = self._wrapper.games or {}
+        if game not in games:
+            raise RequestError(f"Unknown game: {game}")
+        return self._add(endpoints.ACTION_MOUNT_GAMEFILE.format(gamefile = games[game]), PRIORITY_MEDIA)
+
+    def mount_disc(self) -> CommandBatch:
+        return self._add(endpoints.ACTION_MOUNT_DISC, PRIORITY_MEDIA)
+
+    def split(self, max_length: int = MAX_URL_LENGTH) -> list[str]:
+        """Chain the actions into as few request paths as fit in max_length, keeping the order of the actions."""
+        requests = []
+        current = ""
+
+        for action in self._actions:
+            action = quote(action, safe = URL_SAFE_CHARACTERS)
+            if len(action) > max_length:
+                raise RequestError(f"Action is too long for a single request: {action}")
+
+            if current and len(current) + 1 + len(action) > max_length:
+                requests.append(current)
+                current = action
+            else:
+                current = f"{current};{action}" if current else action
+
+        if current:
+            requests.append(current)
+
+        return requests
+
+    async def execute(self):
+        await self._wrapper.send_batch(self)
+
+    def __len__(self) -> int:
+        return len(self._actions)
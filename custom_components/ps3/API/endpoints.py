@@ -8,4 +8,26 @@ MOUNT_GAMEFILE = "http://{ip}/xmb.ps3$exit;/wait.ps3?xmb;{gamefile}"
 MOUNT_DISC = "http://{ip}/xmb.ps3$exit;/wait.ps3?xmb;/mount.ps3/unmount;/insert.ps3"
 PRESS_BUTTON = "http://{ip}/pad.ps3?{button}"
 SHUTDOWN = "http://{ip}/xmb.ps3$exit;/wait.ps3?xmb;/shutdown.ps3?vsh"
-WAIT_FOR_XMB = "http://{ip}/wait.ps3?xmb"
\ No newline at end of file
+WAIT_FOR_XMB = "http://{ip}/wait.ps3?xmb"
+
+# Single webMAN actions, chained with ';' into one request by CommandBatch
+BATCH = "http://{ip}{actions}"
+ACTION_NOTIFICATION = "/popup.ps3?{notification_url}&icon={icon}&snd={sound}"
+ACTION_FAN_MODE = "/cpursx.ps3?{fan_mode_substring}"
+ACTION_TARGET_TEMP = "/cpursx.ps3?max={target_temp}"
+ACTION_FAN_SPEED = "/cpursx.ps3?man;/cpursx.ps3?fan={fan_speed}"
+ACTION_PRESS_BUTTON = "/pad.ps3?{button}"
+ACTION_EXIT_TO_XMB = "/xmb.ps3$exit;/wait.ps3?xmb"
+ACTION_MOUNT_GAMEFILE = "/xmb.ps3$exit;/wait.ps3?xmb;{gamefile}"
+ACTION_MOUNT_DISC = "/xmb.ps3$exit;/wait.ps3?xmb;/mount.ps3/unmount;/insert.ps3"
+ACTION_BEEP = "/beep.ps3?{pattern}"
+
+FAN_MODE_SUBSTRINGS = {'SYSCON': 'fan=0', 'Manual': 'fan=1;/cpursx.ps3?man', 'Dynamic': 'fan=1;/cpursx.ps3?man;/cpursx.ps3?mode', 'Auto': 'fan=2'}
+
+# Labels cpursx.ps3 shows for each fan mode
+FAN_MODES = {
+    'SYSCON': 'SYSCON',
+    'Manual': 'Manual',
+    'MAX': 'Dynamic',
+    'AUTO': 'Auto'
+}
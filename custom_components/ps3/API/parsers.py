@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import re
+from html import unescape
+
+from .endpoints import FAN_MODES
+from .exceptions import SensorError
+
+# Attributes of a tag, skipping over quoted values so that '>' inside them does not end the tag
+_ATTRIBUTES = r'''(?:[^>"']|"[^"]*"|'[^']*')*'''
+_VALUE = r'''(?:"([^"]*)"|'([^']*)')'''
+
+
+def _tag(name: str, attribute: str | None = None, value: str | None = None) -> str:
+    """Pattern for an opening tag, optionally with an attribute of a fixed value (or capturing the value when value is None)."""
+    if attribute is None:
+        return rf'<{name}\b{_ATTRIBUTES}>'
+    value_pattern = _VALUE if value is None else rf'''(?:"{re.escape(value)}"|'{re.escape(value)}')'''
+    return rf'<{name}\b{_ATTRIBUTES}?\s{attribute}\s*=\s*{value_pattern}{_ATTRIBUTES}>'
+
+
+_TAG = re.compile(rf'<{_ATTRIBUTES}>')
+_TEMPERATURE = re.compile(_tag('a', 'href', '/cpursx.ps3?up') + r'(.*?)</a>', re.S | re.I)
+_FAN_SPEED = re.compile(_tag('a', 'href', '/cpursx.ps3?mode') + r'(.*?)</a>', re.S | re.I)
+_SESSION = re.compile(_tag('span', 'style', 'position:relative;top:-20px;') + r'.*?' + _tag('h2') + r'(.*?)</h2>', re.S | re.I)
+_SESSION_LINK = re.compile(_tag('a') + r'(.*?)</a>', re.S | re.I)
+_IMAGE = re.compile(_tag('img', 'src'), re.S | re.I)
+_PLAYBACK = re.compile(_tag('label', 'title', 'Play') + r'.*?</label>([^<]+)', re.S | re.I)
+_MOUNTED = re.compile(_tag('font', 'size', '3') + r'(.*?)</font>', re.S | re.I)
+_HREF = re.compile(_tag('a', 'href'), re.S | re.I)
+_FIRMWARE = re.compile(_tag('a', 'href', '/setup.ps3') + r'([^<]*)', re.S | re.I)
+_MAC_ADDRESS = re.compile(r'MAC Addr : ([^<]*)')
+_GAME_NAME = re.compile(_tag('div', 'class', 'gn') + r'.*?' + _tag('a') + r'(.*?)</a>', re.S | re.I)
+_GAME_LINK = re.compile(_tag('div', 'class', 'ic') + r'.*?' + _tag('a', 'href'), re.S | re.I)
+_GAME_IMAGE = re.compile(_tag('div', 'class', 'ic') + r'\s*' + _tag('a', 'href') + r'\s*' + _tag('img', 'src'), re.S | re.I)
+
+
+def _text(markup: str) -> str:
+    return unescape(_TAG.sub('', markup))
+
+
+def _value(match: re.Match) -> str:
+    """Unescaped attribute value captured by a _tag pattern."""
+    double_quoted, single_quoted = match.groups()[-2:]
+    return unescape(double_quoted if double_quoted is not None else single_quoted)
+
+
+def _parse_temperatures(temperature_text: str, fan_speed_text: str) -> dict:
+    for substring, fan_mode in FAN_MODES.items():
+        if substring in temperature_text:
+            break
+    else:
+        raise SensorError("Fan mode sensor does not work")
+
+    return {
+        'cpu_temp': float(temperature_text.split(': ')[1].split('°C')[0]),
+        'rsx_temp': float(temperature_text.split(': ')[-1].split('°C')[0]),
+        'fan_speed': int(fan_speed_text.split(': ')[1].split('%')[0]),
+        'fan_mode': fan_mode,
+        'target_temp': float(temperature_text.split(': ')[2].split('°C')[0]) if fan_mode == 'Dynamic' else None
+    }
+
+
+def _split_mac_address(text: str) -> str:
+    return text.split('MAC Addr : ')[-1].split(' - ')[0]
+
+
+def fast_parse_telemetry(html: str, static_info: bool = False) -> dict | None:
+    """Extract the cpursx.ps3 fields with precompiled patterns. Returns None when the page does not look as expected."""
+    temperature_match = _TEMPERATURE.search(html)
+    fan_speed_match = _FAN_SPEED.search(html)
+    if temperature_match is None or fan_speed_match is None:
+        return None
+
+    try:
+        telemetry = _parse_temperatures(_text(temperature_match.group(1)), _text(fan_speed_match.group(1)))
+    except (SensorError, IndexError, ValueError):
+        return None
+
+    session_match = _SESSION.search(html)
+    playback_match = _PLAYBACK.search(html)
+    session_links = _SESSION_LINK.findall(session_match.group(1)) if session_match else []
+    if session_links and playback_match:
+        image_match = _IMAGE.search(session_links[2]) if len(session_links) > 2 else None
+        if image_match is None:
+            return None
+        telemetry['media_session'] = {'media_type': 'game',
+                                      'game_id': _text(session_links[0]),
+                                      'game_title': _text(session_links[1]),
+                                      'playback_time': unescape(playback_match.group(1)),
+                                      'image': _value(image_match)
+                                      }
+    elif playback_match:
+        telemetry['media_session'] = {'media_type': 'media', 'playback_time': unescape(playback_match.group(1))}
+    else:
+        telemetry['media_session'] = None
+
+    gamefiles = [_value(href) for block in _MOUNTED.findall(html) for href in _HREF.finditer(block)]
+    telemetry['mounted_gamefile'] = gamefiles[-1] if gamefiles else None
+
+    if static_info:
+        firmware_match = _FIRMWARE.search(html)
+        mac_match = _MAC_ADDRESS.search(html)
+        if firmware_match is None or mac_match is None:
+            return None
+        telemetry['firmware_version'] = unescape(firmware_match.group(1)).split(': ')[-1]
+        telemetry['mac_address'] = _split_mac_address(unescape(mac_match.group(0)))
+
+    return telemetry
+
+
+def fast_parse_games(html: str) -> dict | None:
+    """Extract the index.ps3 game library with precompiled patterns."""
+    names = _GAME_NAME.findall(html)
+    links = [_value(link) for link in _GAME_LINK.finditer(html)]
+    if len(names) != len(links):
+        return None
+    return {_text(name): link for name, link in zip(names, links)}
+
+
+def parse_game_images(html: str) -> dict:
+    """Cover art path of each game in index.ps3, by game link."""
+    images = {}
+    for match in _GAME_IMAGE.finditer(html):
+        link_double, link_single, image_double, image_single = match.groups()
+        images[unescape(link_double if link_double is not None else link_single)] = unescape(image_double if image_double is not None else image_single)
+    return images
+
+
+def soup_parse_telemetry(html: str, static_info: bool = False) -> dict:
+    """Extract the cpursx.ps3 fields from a full BeautifulSoup tree."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    temperature_text = soup.find('a', class_='s', href = '/cpursx.ps3?up').text
+    fan_speed_text = soup.find('a', class_='s', href = '/cpursx.ps3?mode').text
+    telemetry = _parse_temperatures(temperature_text, fan_speed_text)
+
+    game_session_tags = soup.select('span[style="position:relative;top:-20px;"] h2 a')
+    playback_state = soup.find('label', title = 'Play')
+    if game_session_tags and playback_state:
+        telemetry['media_session'] = {'media_type': 'game',
+                                      'game_id': game_session_tags[0].text,
+                                      'game_title': game_session_tags[1].text,
+                                      'playback_time': str(playback_state.next_sibling),
+                                      'image': game_session_tags[2].find('img')['src']
+                                      }
+    elif playback_state:
+        telemetry['media_session'] = {'media_type': 'media', 'playback_time': str(playback_state.next_sibling)}
+    else:
+        telemetry['media_session'] = None
+
+    gamefile_tags = soup.select('font[size="3"] a')
+    telemetry['mounted_gamefile'] = gamefile_tags[-1]['href'] if gamefile_tags else None
+
+    if static_info:
+        telemetry['firmware_version'] = soup.find('a', class_ = "s", href="/setup.ps3").contents[0].split(': ')[-1]
+        telemetry['mac_address'] = soup_parse_mac_address(html, soup)
+
+    return telemetry
+
+
+def soup_parse_games(html: str) -> dict | None:
+    """Extract the index.ps3 game library from a full BeautifulSoup tree."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    game_names = soup.select('div[class="gn"] a')
+    game_links = soup.select('div[class="ic"] a')
+    if game_names and game_links:
+        return {name.text: link['href'] for name, link in zip(game_names, game_links)}
+    return None
+
+
+def soup_parse_mac_address(html: str, soup = None) -> str:
+    if soup is None:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+    return _split_mac_address(soup.find(string = lambda mac: 'MAC Addr' in mac))
+
+
+def parse_telemetry(html: str, static_info: bool = False) -> dict:
+    """Extract the cpursx.ps3 fields, falling back to BeautifulSoup for pages the fast extractor does not understand."""
+    telemetry = fast_parse_telemetry(html, static_info)
+    if telemetry is None:
+        telemetry = soup_parse_telemetry(html, static_info)
+    return telemetry
+
+
+def parse_mac_address(html: str) -> str:
+    mac_match = _MAC_ADDRESS.search(html)
+    if mac_match is not None:
+        return _split_mac_address(unescape(mac_match.group(0)))
+    return soup_parse_mac_address(html)
+
+
+def parse_games(html: str) -> dict | None:
+    """Extract the index.ps3 game library, falling back to BeautifulSoup for pages the fast extractor does not understand."""
+    games = fast_parse_games(html)
+    if not games:
+        games = soup_parse_games(html)
+    return games
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from itertools import count
+from time import monotonic
+
+from .exceptions import LockError
+
+# Lower values run first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SETTING = 1
+PRIORITY_MEDIA = 2
+PRIORITY_POWER = 3
+
+class CommandQueue:
+    """Serializes commands onto the single request handler of webMAN, ordered by priority."""
+
+    def __init__(self, max_size: int = 16):
+        self._queue = asyncio.PriorityQueue(max_size)
+        self._order = count()
+        self._worker = None
+
+    async def submit(self, func, priority: int = PRIORITY_SETTING, deadline: float = 30):
+        """Queue func and wait for its result. The command is dropped if it could not start within deadline seconds."""
+        if self._queue.full():
+            raise LockError("Too many requests waiting for the device")
+
+        future = asyncio.get_running_loop().create_future()
+        # The insertion order keeps commands of the same priority first in, first out
+        self._queue.put_nowait((priority, next(self._order), monotonic() + deadline, func, future))
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+        # Cancelling the caller cancels the future, which drops or aborts the command
+        return await future
+
+    async def _run(self):
+        # The worker ends once the queue is empty, submit starts a new one
+        while not self._queue.empty():
+            _, _, deadline, func, future = self._queue.get_nowait()
+
+            if future.done():
+                continue
+
+            if monotonic() > deadline:
+                future.set_exception(LockError("Waiting for other requests took too long"))
+                continue
+
+            task = asyncio.ensure_future(func())
+            future.add_done_callback(lambda future, task = task: task.cancel() if future.cancelled() else None)
+
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                # Either the caller gave up on this command or the queue itself is closing
+                if not future.cancelled():
+                    future.cancel()
+                    raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while not self._queue.empty():
+            _, _, _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+
+
+class Coalescer:
+    """Collapses rapid successive calls per key into a single call with the last submitted value."""
+
+    def __init__(self, window: float = 0.5):
+        self.window = window
+        self._pending = {}
+        self._tasks = set()
+
+    async def submit(self, key: str, func) -> bool:
+        """Run func once no newer call for key arrived within the window. Returns False when func was superseded."""
+        if self.window <= 0:
+            await func()
+            return True
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if key in self._pending:
+            timer, _, waiters = self._pending[key]
+            timer.cancel()
+        else:
+            waiters = []
+
+        waiters.append(future)
+        timer = loop.call_later(self.window, self._start, key)
+        self._pending[key] = (timer, func, waiters)
+
+        await future
+        return future is waiters[-1]
+
+    def _start(self, key: str):
+        # Keep a reference until the call is done, the loop only holds weak references to tasks
+        task = asyncio.get_running_loop().create_task(self._fire(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fire(self, key: str):
+        _, func, waiters = self._pending.pop(key)
+
+        try:
+            await func()
+        except asyncio.CancelledError:
+            for waiter in waiters:
+                waiter.cancel()
+            raise
+        except Exception as e:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+        else:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    async def close(self):
+        for timer, _, waiters in self._pending.values():
+            timer.cancel()
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.cancel()
+        self._pending.clear()
+
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions = True)
+
+
+class NotificationQueue:
+    """Sends popups one at a time and at most one per interval. Identical messages within the dedupe window are sent
+    once, and messages waiting together can be merged into one popup."""
+
+    def __init__(self, send, interval: float = 1.0, dedupe_window: float = 10.0, merge: bool = False,
+                 max_size: int = 32, retention: float = 300, merged_length: int = 200):
+        self._send = send
+        self.interval = interval
+        self.dedupe_window = dedupe_window
+        self.merge = merge
+        self.max_size = max_size
+        self.retention = retention
+        self.merged_length = merged_length
+        self._pending = deque()
+        self._recent = {}
+        self._last_sent = None
+        self._worker = None
+
+    async def submit(self, message: str, icon: int = 1, sound: int = 1) -> bool:
+        """Wait until the message was shown. Returns False when an identical message made it unnecessary."""
+        key = (message, icon, sound)
+        now = monotonic()
+
+        for pending_key, _, future in self._pending:
+            if pending_key == key:
+                await asyncio.shield(future)
+                return False
+
+        sent = self._recent.get(key)
+        if sent is not None and now - sent < self.dedupe_window:
+            return False
+
+        if len(self._pending) >= self.max_size:
+            raise LockError("Too many notifications waiting for the device")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((key, now + self.retention, future))
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+        await asyncio.shield(future)
+        return True
+
+    def _take(self) -> list:
+        entries = [self._pending.popleft()]
+        if not self.merge:
+            return entries
+
+        (message, icon, sound), _, _ = entries[0]
+        length = len(message)
+        # Only messages with the same icon and sound can share a popup
+        while self._pending:
+            (next_message, next_icon, next_sound), _, _ = self._pending[0]
+            if (next_icon, next_sound) != (icon, sound) or length + 1 + len(next_message) > self.merged_length:
+                break
+            length += 1 + len(next_message)
+            entries.append(self._pending.popleft())
+        return entries
+
+    async def _run(self):
+        while self._pending:
+            if self._last_sent is not None:
+                wait = self._last_sent + self.interval - monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            entries = [entry for entry in self._take() if not entry[2].done()]
+            if not entries:
+                continue
+
+            (_, icon, sound), _, _ = entries[0]
+            message = "\n".join(key[0] for key, _, _ in entries)
+
+            try:
+                await self._send(message, icon, sound)
+            except LockError as e:
+                # The console is busy, keep the messages for a later attempt until they are too old
+                now = monotonic()
+                for entry in reversed(entries):
+                    if now < entry[1]:
+                        self._pending.appendleft(entry)
+                    else:
+                        entry[2].set_exception(e)
+                self._last_sent = now
+                continue
+            except Exception as e:
+                for _, _, future in entries:
+                    future.set_exception(e)
+            else:
+                now = monotonic()
+                for key, _, future in entries:
+                    self._recent[key] = now
+                    future.set_result(None)
+
+            self._last_sent = monotonic()
+            self._recent = {key: sent for key, sent in self._recent.items() if self._last_sent - sent < self.dedupe_window}
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while self._pending:
+            _, _, future = self._pending.popleft()
+            if not future.done():
+                future.cancel()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections import deque
+from html.parser import HTMLParser
+
+from .exceptions import SensorError
+from .parsers import _GAME_LINK, _GAME_NAME, parse_game_images, _parse_temperatures, _split_mac_address, _text, _value
+
+
+class GameStreamParser:
+    """Incremental index.ps3 tokenizer that hands out (name, link) pairs while the page is still being received.
+
+    Only the part of the page after the last complete game entry is kept between chunks."""
+
+    def __init__(self):
+        self._buffer = ''
+        self._names = deque()
+        self._links = deque()
+        self.images = {}
+
+    def _scan(self, html: str):
+        self.images.update(parse_game_images(html))
+        self._names.extend(_text(name) for name in _GAME_NAME.findall(html))
+        self._links.extend(_value(link) for link in _GAME_LINK.finditer(html))
+
+    def games(self, data: str):
+        """Feed the next part of the page and yield every game that is complete by now."""
+        self._buffer += data
+
+        # Every game entry starts with a div, so everything before the last one is complete
+        cut = max(self._buffer.rfind('<div'), self._buffer.rfind('<DIV'))
+        if cut > 0:
+            self._scan(self._buffer[:cut])
+            self._buffer = self._buffer[cut:]
+
+        while self._names and self._links:
+            yield self._names.popleft(), self._links.popleft()
+
+    def close(self):
+        """Scan what is left of the page and yield the remaining games."""
+        self._scan(self._buffer)
+        self._buffer = ''
+
+        while self._names and self._links:
+            yield self._names.popleft(), self._links.popleft()
+
+    @property
+    def complete(self) -> bool:
+        """False when names and links did not pair up, the page then needs the BeautifulSoup parser."""
+        return not self._names and not self._links
+
+
+class TelemetryStreamParser(HTMLParser):
+    """Incremental cpursx.ps3 tokenizer. Sets done as soon as the firmware link, which follows all
+    other fields on the page, and the MAC address (when static_info is asked for) have been read."""
+
+    def __init__(self, static_info: bool = False):
+        super().__init__(convert_charrefs = True)
+        self.static_info = static_info
+        self.done = False
+        self._texts = {}
+        self._data = []
+        self._capture = None
+        self._session_depth = 0
+        self._in_session_title = False
+        self._session_links = []
+        self._image = None
+        self._in_play_label = False
+        self._after_play_label = False
+        self._playback_time = None
+        self._font_depth = 0
+        self._mounted_gamefile = None
+        self._firmware_version = None
+        self._mac_address = None
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        attrs = dict(attrs)
+        self._after_play_label = False
+
+        if tag == 'a':
+            href = attrs.get('href')
+            if href == '/cpursx.ps3?up' and 'temperature' not in self._texts:
+                self._capture = 'temperature'
+            elif href == '/cpursx.ps3?mode' and 'fan_speed' not in self._texts:
+                self._capture = 'fan_speed'
+            elif href == '/setup.ps3' and self._firmware_version is None:
+                self._capture = 'firmware'
+            elif self._in_session_title:
+                self._capture = 'session'
+                self._session_links.append([])
+
+            if self._font_depth and href is not None:
+                self._mounted_gamefile = href
+        elif tag == 'span':
+            if self._session_depth or attrs.get('style') == 'position:relative;top:-20px;':
+                self._session_depth += 1
+        elif tag == 'h2' and self._session_depth:
+            self._in_session_title = True
+        elif tag == 'img' and self._capture == 'session' and len(self._session_links) == 3 and self._image is None:
+            self._image = attrs.get('src')
+        elif tag == 'font' and (self._font_depth or attrs.get('size') == '3'):
+            self._font_depth += 1
+        elif tag == 'label':
+            self._in_play_label = attrs.get('title') == 'Play'
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag == 'a' and self._capture is not None:
+            if self._capture == 'firmware':
+                self.done = not self.static_info or self._mac_address is not None
+            self._capture = None
+        elif tag == 'span' and self._session_depth:
+            self._session_depth -= 1
+        elif tag == 'h2':
+            self._in_session_title = False
+        elif tag == 'label' and self._playback_time is None:
+            # The playback time is the text right after the closing tag of the playback label
+            self._after_play_label = self._in_play_label
+            self._in_play_label = False
+        elif tag == 'font' and self._font_depth:
+            self._font_depth -= 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_data(self, data):
+        # A text node may arrive in pieces when it is split between chunks
+        self._data.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self):
+        if self._data:
+            data = ''.join(self._data)
+            self._data.clear()
+            self._handle_text(data)
+
+    def _handle_text(self, data):
+        if self._after_play_label:
+            self._playback_time = data
+            self._after_play_label = False
+
+        if self._capture == 'temperature' or self._capture == 'fan_speed':
+            self._texts[self._capture] = self._texts.get(self._capture, '') + data
+        elif self._capture == 'session':
+            self._session_links[-1].append(data)
+        elif self._capture == 'firmware' and self._firmware_version is None:
+            self._firmware_version = data.split(': ')[-1]
+
+        if self._mac_address is None and 'MAC Addr' in data:
+            self._mac_address = _split_mac_address(data)
+            self.done = self.done or self._firmware_version is not None
+
+    def telemetry(self) -> dict:
+        """The fields read so far, in the same form as parse_telemetry returns them."""
+        if 'temperature' not in self._texts or 'fan_speed' not in self._texts:
+            raise SensorError("Temperature and fan speed not found on the page")
+
+        telemetry = _parse_temperatures(self._texts['temperature'], self._texts['fan_speed'])
+
+        if self._session_links and self._playback_time is not None:
+            telemetry['media_session'] = {'media_type': 'game',
+                                          'game_id': ''.join(self._session_links[0]),
+                                          'game_title': ''.join(self._session_links[1]),
+                                          'playback_time': self._playback_time,
+                                          'image': self._image
+                                          }
+        elif self._playback_time is not None:
+            telemetry['media_session'] = {'media_type': 'media', 'playback_time': self._playback_time}
+        else:
+            telemetry['media_session'] = None
+
+        telemetry['mounted_gamefile'] = self._mounted_gamefile
+
+        if self.static_info:
+            telemetry['firmware_version'] = self._firmware_version
+            telemetry['mac_address'] = self._mac_address
+
+        return telemetry
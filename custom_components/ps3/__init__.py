@@ -2,16 +2,30 @@ from __future__ import annotations
 
 import logging
 import asyncio
+import shutil
+from dataclasses import replace
 from datetime import timedelta
-from homeassistant.const import CONF_NAME, Platform
-from homeassistant.core import HomeAssistant
+from itertools import islice
+from time import monotonic
+from homeassistant.const import CONF_NAME, CONF_SCAN_INTERVAL, EVENT_HOMEASSISTANT_CLOSE, Platform
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import discovery
+from homeassistant.helpers.storage import Store, STORAGE_DIR
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util.dt import utcnow
 from .API.PS3MAPI import PS3MAPIWrapper, SensorError
-from .const import CONF_ENTRY_ID, ENTRIES, DATA_HASS_CONFIG, DOMAIN, PLATFORMS
+from .art import ArtCache
+from .engine import PollingEngine
+from .snapshot import PS3Snapshot, PS3Library
+from .const import (
+    CONF_ENTRY_ID, ENTRIES, ENGINE, ENGINE_CLOSE_LISTENER, DATA_HASS_CONFIG, DOMAIN, PLATFORMS, TELEMETRY_UPDATE_INTERVAL, LIBRARY_UPDATE_INTERVAL,
+    FAST_UPDATE_INTERVAL, MAX_UPDATE_INTERVAL, COMMAND_BOOST_DURATION, TARGET_TEMP_MARGIN, CONF_COALESCE_WINDOW, COALESCE_WINDOW,
+    CONF_STREAMING, STORAGE_VERSION, STORAGE_SAVE_DELAY, XMB_SOURCE,
+    MEDIA_POSITION_TOLERANCE, CONF_MAX_SOURCES, CONF_MERGE_NOTIFICATIONS
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,14 +43,42 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN].setdefault(ENTRIES, {})
 
-    coordinator = PS3Coordinator(hass, entry)
+    # All consoles share one polling engine, created with the first one
+    if ENGINE not in hass.data[DOMAIN]:
+        engine = hass.data[DOMAIN][ENGINE] = PollingEngine()
 
-    await coordinator.async_config_entry_first_refresh()
+        async def _async_close_engine(event):
+            hass.data[DOMAIN].pop(ENGINE_CLOSE_LISTENER, None)
+            await engine.async_close()
+
+        hass.data[DOMAIN][ENGINE_CLOSE_LISTENER] = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_engine)
+    engine = hass.data[DOMAIN][ENGINE]
+    engine.register(entry.entry_id)
+
+    coordinator = PS3Coordinator(hass, entry, engine)
+
+    try:
+        if await coordinator.library.async_load_cache():
+            # Entities start from the cached library, the console is only read for telemetry before they are added
+            await coordinator.async_config_entry_first_refresh()
+            hass.async_create_task(coordinator.library.async_refresh())
+        else:
+            # The full library refresh also reads the telemetry, so the first telemetry refresh can be served from memory
+            await coordinator.library.async_config_entry_first_refresh()
+            coordinator.update_from_memory = True
+            await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        await coordinator.library.art.async_close()
+        await coordinator.wrapper.close()
+        await _async_release_engine(hass, entry)
+        raise
 
     hass.data[DOMAIN][ENTRIES][entry.entry_id] = {"coordinator": coordinator}
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     hass.async_create_task(
         discovery.async_load_platform(
             hass,
@@ -54,48 +96,272 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN][ENTRIES].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN][ENTRIES].pop(entry.entry_id)["coordinator"]
+        await coordinator.library.art.async_close()
+        await coordinator.wrapper.close()
+        await _async_release_engine(hass, entry)
 
     return unload_ok
 
 
+async def _async_release_engine(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    engine = hass.data[DOMAIN][ENGINE]
+    if not engine.unregister(entry.entry_id):
+        return
+
+    # Forget the engine before closing it, an entry set up meanwhile creates a new one instead of joining the closing one
+    hass.data[DOMAIN].pop(ENGINE)
+    remove_listener = hass.data[DOMAIN].pop(ENGINE_CLOSE_LISTENER, None)
+    if remove_listener is not None:
+        remove_listener()
+    await engine.async_close()
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await PS3LibraryCoordinator.get_store(hass, entry).async_remove()
+    await hass.async_add_executor_job(shutil.rmtree, PS3LibraryCoordinator.get_art_directory(hass, entry), True)
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 class PS3Coordinator(DataUpdateCoordinator):
-    """Class to handle updates from PS3"""
+    """Class to handle fast telemetry updates from PS3"""
 
-    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry, engine: PollingEngine) -> None:
         """Initialize data update coordinator."""
         self.ip_address = config_entry.data.get("ip_address")
-        self.wrapper = PS3MAPIWrapper(self.ip_address)
+        self.entry_id = config_entry.entry_id
+        self.engine = engine
+        self.wrapper = PS3MAPIWrapper(
+            self.ip_address, 
+            session = engine.session, 
+            coalesce_window = config_entry.options.get(CONF_COALESCE_WINDOW, COALESCE_WINDOW),
+            streaming = config_entry.options.get(CONF_STREAMING, False),
+            merge_notifications = config_entry.options.get(CONF_MERGE_NOTIFICATIONS, False),
+            throttle = lambda: engine.poll(config_entry.entry_id, "confirm")
+        )
+        self.wrapper.add_update_listener(self._handle_wrapper_update)
+        self.library = PS3LibraryCoordinator(hass, config_entry, self.wrapper, engine)
         self.startup_lock = asyncio.Lock()
         self.update_from_memory = False
+        self._base_interval = config_entry.options.get(CONF_SCAN_INTERVAL, TELEMETRY_UPDATE_INTERVAL)
+        self._boost_until = 0.0
+        self._off_updates = 0
 
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN} ({config_entry.unique_id})",
-            update_interval=timedelta(seconds=30),
+            update_interval=timedelta(seconds=self._base_interval),
+            always_update=False,
         )
 
+    def boost(self):
+        """Poll at the fast interval for a while, e.g. after a command was sent."""
+        self._boost_until = monotonic() + COMMAND_BOOST_DURATION
+        self._off_updates = 0
+
+        # The refresh already scheduled may be a backed-off one, so move it up to the fast interval
+        self.update_interval = timedelta(seconds=min(FAST_UPDATE_INTERVAL, self._base_interval))
+        self._schedule_refresh()
+
+    def _next_update_interval(self) -> timedelta:
+        if self.wrapper.state == "Off":
+            # Back off exponentially while the console is turned off
+            self._off_updates += 1
+            seconds = min(self._base_interval * 2 ** (self._off_updates - 1), MAX_UPDATE_INTERVAL)
+        else:
+            self._off_updates = 0
+            target_temp = self.wrapper.target_temp
+            temps = [temp for temp in (self.wrapper.cpu_temp, self.wrapper.rsx_temp) if temp is not None]
+            near_target = target_temp is not None and temps and max(temps) >= target_temp - TARGET_TEMP_MARGIN
+
+            if monotonic() < self._boost_until or near_target:
+                seconds = min(FAST_UPDATE_INTERVAL, self._base_interval)
+            else:
+                seconds = self._base_interval
+
+        return timedelta(seconds=seconds)
+
     async def _async_update_data(self):
+        previous_state = self.data.state if self.data is not None else None
 
         if not self.update_from_memory:
 
             try:
-                await self.wrapper.update()
+                async with self.engine.poll(self.entry_id, "telemetry"):
+                    await self.wrapper.update_telemetry()
             except SensorError as e:
                 raise HomeAssistantError(e)
 
         self.update_from_memory = False
+
+        # The library only needs to be read again when the console was turned on or off
+        if previous_state is not None and previous_state != self.wrapper.state:
+            await self.library.async_request_refresh()
+
+        self.update_interval = self._next_update_interval()
         
-        return {
-                "state": self.wrapper.state,
-                "cpu_temp": self.wrapper.cpu_temp,
-                "rsx_temp": self.wrapper.rsx_temp,
-                "fan_speed": self.wrapper.fan_speed,
-                "fan_mode": self.wrapper.fan_mode,
-                "target_temp": self.wrapper.target_temp,
-                "media_session": self.wrapper.media_session,
-                "games": self.wrapper.games,
-                "mounted_gamefile": self.wrapper.mounted_gamefile,
-                "firmware_version": self.wrapper.firmware_version
-            }
+        return self._snapshot()
+
+    @callback
+    def _handle_wrapper_update(self):
+        """Push the telemetry the wrapper read to confirm a command, instead of waiting for the next poll."""
+        if self.data is None:
+            return
+
+        if self.data.state != self.wrapper.state:
+            self.hass.async_create_task(self.library.async_request_refresh())
+
+        self.async_set_updated_data(self._snapshot())
+
+    def _snapshot(self) -> PS3Snapshot:
+        media_session, media_position_updated_at = self._media_sample(self.wrapper.media_session)
+
+        snapshot = PS3Snapshot(
+            state = self.wrapper.state,
+            cpu_temp = self.wrapper.cpu_temp,
+            rsx_temp = self.wrapper.rsx_temp,
+            fan_speed = self.wrapper.fan_speed,
+            fan_mode = self.wrapper.fan_mode,
+            target_temp = self.wrapper.target_temp,
+            media_session = media_session,
+            mounted_gamefile = self.wrapper.mounted_gamefile,
+            media_position_updated_at = media_position_updated_at,
+            update_interval = self.update_interval.total_seconds()
+        )
+
+        # Keep the previous snapshot when nothing changed, so listeners are not called at all
+        return self.data if snapshot == self.data else snapshot
+
+    def _media_sample(self, media_session):
+        """Keep the previous playback sample as long as the position reported by the console matches its extrapolation."""
+        now = utcnow()
+        if media_session is None or media_session.get("playback_seconds") is None:
+            return media_session, None
+
+        previous = self.data.media_session if self.data is not None else None
+        sampled_at = self.data.media_position_updated_at if self.data is not None else None
+        if previous is not None and sampled_at is not None:
+            same_media = all(previous.get(key) == media_session.get(key) for key in ("media_type", "game_id", "game_title", "image_url"))
+            expected = previous["playback_seconds"] + (now - sampled_at).total_seconds()
+            # The frontend extrapolates the position itself, so an unchanged sample means no state write
+            if same_media and abs(media_session["playback_seconds"] - expected) <= MEDIA_POSITION_TOLERANCE:
+                return previous, sampled_at
+
+        return media_session, now
+
+    async def async_apply_optimistic(self, command, **expected):
+        """Show the expected state right away and verify it with a telemetry refresh in the background."""
+        self.async_set_updated_data(replace(self.data, **expected))
+
+        try:
+            sent = await command
+        except Exception:
+            # Roll back to the last state reported by the console
+            self.async_set_updated_data(self._snapshot())
+            raise
+
+        # Superseded setpoints are verified by the call that actually sent its value
+        if sent is not False:
+            self.hass.async_create_task(self._async_verify(expected))
+
+        return sent
+
+    async def _async_verify(self, expected):
+        await self.async_refresh()
+
+        if self.data is not None:
+            mismatches = {key: getattr(self.data, key) for key, value in expected.items() if getattr(self.data, key) != value}
+            if mismatches:
+                _LOGGER.debug("Console did not apply %s, it reports %s", expected, mismatches)
+
+
+class PS3LibraryCoordinator(DataUpdateCoordinator):
+    """Class to handle slow game library updates from PS3"""
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry, wrapper: PS3MAPIWrapper, engine: PollingEngine) -> None:
+        """Initialize data update coordinator."""
+        self.wrapper = wrapper
+        self.entry_id = config_entry.entry_id
+        self.engine = engine
+        self._store = self.get_store(hass, config_entry)
+        self.art = ArtCache(
+            hass, self.get_art_directory(hass, config_entry), engine.session, throttle = lambda: engine.poll(config_entry.entry_id, "art")
+        )
+        self._max_sources = config_entry.options.get(CONF_MAX_SOURCES, 0)
+        self._stored = None
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} library ({config_entry.unique_id})",
+            update_interval=timedelta(seconds=LIBRARY_UPDATE_INTERVAL),
+            always_update=False,
+        )
+
+    @staticmethod
+    def get_store(hass: HomeAssistant, config_entry: ConfigEntry) -> Store:
+        return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}")
+
+    @staticmethod
+    def get_art_directory(hass: HomeAssistant, config_entry: ConfigEntry) -> str:
+        return hass.config.path(STORAGE_DIR, f"{DOMAIN}_art", config_entry.entry_id)
+
+    async def async_load_cache(self) -> bool:
+        """Restore the library saved by an earlier run. Returns False when there is none."""
+        self._stored = await self._store.async_load()
+        if not self._stored:
+            return False
+
+        self.wrapper.restore_library(self._stored.get("games"), self._stored.get("firmware_version"), self._stored.get("mac_address"))
+        self.async_set_updated_data(self._library())
+        return True
+
+    def _library(self) -> PS3Library:
+        games = self.wrapper.games
+        if self.data is not None and self.data.games is games:
+            sources = self.data.sources
+        else:
+            # The rest of a large library is reachable through the media browser
+            sources = [*islice(games or (), self._max_sources or None), XMB_SOURCE]
+
+        library = PS3Library(
+            games = games,
+            game_names = self.wrapper.game_names,
+            sources = sources,
+            images = self.wrapper.game_images,
+            firmware_version = self.wrapper.firmware_version,
+            mac_address = self.wrapper.mac_address
+        )
+        return self.data if library == self.data else library
+
+    async def _async_update_data(self):
+
+        try:
+            async with self.engine.poll(self.entry_id, "library"):
+                await self.wrapper.update()
+        except SensorError as e:
+            raise HomeAssistantError(e)
+
+        library = self._library()
+
+        # Only write to disk when something changed, the library hardly ever does
+        stored = {
+            "games": dict(library.games) if library.games is not None else None,
+            "firmware_version": library.firmware_version,
+            "mac_address": library.mac_address
+        }
+        if stored != self._stored:
+            self._stored = stored
+            self._store.async_delay_save(lambda: stored, STORAGE_SAVE_DELAY)
+
+        # Cover art is copied while the console is idle anyway, so the frontend never has to wait for its web server
+        if library.images and self.wrapper.state != "Off":
+            self.art.async_prefetch(
+                {link: self.wrapper.image_url(path) for link, path in library.images.items()}, lambda: self.wrapper.state != "Off"
+            )
+
+        return library
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from contextlib import nullcontext
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+
+from .const import ART_MEMORY_LIMIT, ART_DISK_LIMIT, ART_FETCH_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPES = {b'\x89PNG': 'image/png', b'\xff\xd8\xff': 'image/jpeg', b'GIF8': 'image/gif'}
+
+
+def _content_type(image: bytes) -> str:
+    for magic, content_type in CONTENT_TYPES.items():
+        if image.startswith(magic):
+            return content_type
+    return 'application/octet-stream'
+
+
+class ArtCache:
+    """Cover art of one console in a bounded in-memory LRU, backed by a bounded directory on disk.
+
+    Keys are game IDs for the art of a running game and game links for the art listed on index.ps3."""
+
+    def __init__(self, hass: HomeAssistant, directory: str, session, throttle = None,
+                 memory_limit: int = ART_MEMORY_LIMIT, disk_limit: int = ART_DISK_LIMIT):
+        self._hass = hass
+        self._directory = directory
+        self._session = session
+        # Returns an async context manager each download runs in, so image requests queue up with the polls
+        self._throttle = throttle or nullcontext
+        self._memory_limit = memory_limit
+        self._disk_limit = disk_limit
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        # File names on disk, least recently used first. Read from the directory once, then kept up to date
+        self._disk = None
+        self._fetching = {}
+        self._prefetch = None
+        self._closed = False
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _remember(self, key: str, image: bytes):
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        self._memory[key] = image
+        self._memory_size += len(image)
+
+        while self._memory_size > self._memory_limit and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last = False)
+            self._memory_size -= len(evicted)
+
+    def _scan(self) -> list[str]:
+        try:
+            entries = [entry for entry in os.scandir(self._directory) if not entry.name.endswith('.tmp')]
+        except FileNotFoundError:
+            return []
+        # The modification time is the last use, so the order survives restarts
+        entries.sort(key = lambda entry: entry.stat().st_mtime)
+        return [entry.name for entry in entries]
+
+    async def _async_index(self) -> OrderedDict:
+        if self._disk is None:
+            names = await self._hass.async_add_executor_job(self._scan)
+            if self._disk is None:
+                self._disk = OrderedDict.fromkeys(names)
+        return self._disk
+
+    def _read(self, name: str) -> bytes | None:
+        path = os.path.join(self._directory, name)
+        try:
+            with open(path, 'rb') as file:
+                image = file.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return image
+
+    def _write(self, name: str, image: bytes, evicted: list[str]):
+        os.makedirs(self._directory, exist_ok = True)
+        path = os.path.join(self._directory, name)
+        with open(path + '.tmp', 'wb') as file:
+            file.write(image)
+        os.replace(path + '.tmp', path)
+
+        for evicted_name in evicted:
+            try:
+                os.remove(os.path.join(self._directory, evicted_name))
+            except FileNotFoundError:
+                pass
+
+    async def async_get(self, key: str, url: str | None = None) -> tuple[bytes | None, str | None]:
+        """Art for key from memory, disk or, when a URL is given, the console."""
+        image = self._memory.get(key)
+        if image is not None:
+            self._memory.move_to_end(key)
+            return image, _content_type(image)
+
+        disk = await self._async_index()
+        name = self._name(key)
+        image = None
+        if name in disk:
+            disk.move_to_end(name)
+            image = await self._hass.async_add_executor_job(self._read, name)
+            if image is None:
+                disk.pop(name, None)
+        if image is None and url is not None:
+            try:
+                image = await self._async_fetch(key, url)
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                _LOGGER.debug("Could not fetch cover art %s: %s", url, e)
+        if image is None:
+            return None, None
+
+        self._remember(key, image)
+        return image, _content_type(image)
+
+    async def _async_fetch(self, key: str, url: str) -> bytes | None:
+        if self._closed:
+            return None
+
+        # Clients asking for the same art at the same time share one request to the console
+        task = self._fetching.get(key)
+        if task is None:
+            task = self._fetching[key] = asyncio.get_running_loop().create_task(self._async_download(key, url))
+            task.add_done_callback(lambda _: self._fetching.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _async_download(self, key: str, url: str) -> bytes | None:
+        """Download the art, None when the console has none. Connection errors are raised."""
+        async with self._throttle():
+            async with self._session.get(url, timeout = ART_FETCH_TIMEOUT) as response:
+                if response.status != 200:
+                    return None
+                image = await response.read()
+
+        if self._closed:
+            return image
+
+        disk = await self._async_index()
+        name = self._name(key)
+        disk[name] = None
+        disk.move_to_end(name)
+        evicted = [disk.popitem(last = False)[0] for _ in range(len(disk) - self._disk_limit)]
+        await self._hass.async_add_executor_job(self._write, name, image, evicted)
+        return image
+
+    def async_prefetch(self, images: dict[str, str], is_on):
+        """Fetch the art of the games not cached yet in the background, one image at a time, while is_on() holds.
+
+        Prefetching never evicts, it stops once the cache is full, so a library larger than the cache is not
+        copied again on every refresh. It also stops at the first connection error, the next library refresh
+        picks up where it left off."""
+        if self._closed or (self._prefetch is not None and not self._prefetch.done()):
+            return
+
+        async def prefetch():
+            disk = await self._async_index()
+            for key, url in images.items():
+                if len(disk) >= self._disk_limit or not is_on():
+                    break
+                if self._name(key) not in disk:
+                    try:
+                        await self._async_fetch(key, url)
+                    except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                        _LOGGER.debug("Stopped prefetching cover art of %s: %s", self._directory, e)
+                        break
+
+        self._prefetch = self._hass.async_create_background_task(prefetch(), f"ps3 cover art prefetch {self._directory}")
+
+    async def async_close(self):
+        self._closed = True
+        tasks = [task for task in (self._prefetch, *self._fetching.values()) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions = True)
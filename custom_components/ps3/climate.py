@@ -2,19 +2,17 @@ from __future__ import annotations
 
 import logging
 import asyncio
-import aiohttp
 
 from homeassistant.components.climate import ClimateEntity, HVACMode, ClimateEntityFeature
 from homeassistant.core import HomeAssistant
 from homeassistant.const import UnitOfTemperature
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 
 from .const import MAX_TEMP, MIN_TEMP, DOMAIN, ENTRIES, SCRIPT_DOMAIN, TURN_ON_SCRIPT, SYSTEM_TEMP_KEY, NAME, MANUFACTURER
-from .helpers import request
+from .helpers import request, SnapshotEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,8 +26,9 @@ async def async_setup_entry(
     )
 
 
-class TempRegulator(ClimateEntity, CoordinatorEntity):
+class TempRegulator(ClimateEntity, SnapshotEntity):
     _enable_turn_on_off_backwards_compatibility = False
+    _snapshot_fields = frozenset({"cpu_temp", "rsx_temp", "fan_mode", "target_temp"})
     
     def __init__(self, coordinator, turn_on_script, service_registry, mac_address):
         super().__init__(coordinator)
@@ -46,8 +45,8 @@ class TempRegulator(ClimateEntity, CoordinatorEntity):
     @property
     def extra_state_attributes(self):
         if self.coordinator.data is not None:
-            rsx_temp = self.coordinator.data.get("rsx_temp")
-            cpu_temp = self.coordinator.data.get("cpu_temp")
+            rsx_temp = self.coordinator.data.rsx_temp
+            cpu_temp = self.coordinator.data.cpu_temp
         else:
             rsx_temp = None
             cpu_temp = None
@@ -61,8 +60,8 @@ class TempRegulator(ClimateEntity, CoordinatorEntity):
     @property
     def current_temperature(self):
         if self.coordinator.data is not None:
-            rsx_temp = self.coordinator.data.get("rsx_temp")
-            cpu_temp = self.coordinator.data.get("cpu_temp")
+            rsx_temp = self.coordinator.data.rsx_temp
+            cpu_temp = self.coordinator.data.cpu_temp
             if rsx_temp and cpu_temp:
                 return max(cpu_temp, rsx_temp)
         return None
@@ -70,7 +69,7 @@ class TempRegulator(ClimateEntity, CoordinatorEntity):
     @property
     def fan_mode(self):
         if self.coordinator.data is not None:
-            return self.coordinator.data.get("fan_mode")
+            return self.coordinator.data.fan_mode
         return None
 
     @property
@@ -80,7 +79,7 @@ class TempRegulator(ClimateEntity, CoordinatorEntity):
     @property
     def hvac_mode(self):
         if self.coordinator.data is not None:
-            if self.coordinator.data.get("fan_mode") is not None:
+            if self.coordinator.data.fan_mode is not None:
                 return HVACMode.COOL
         return HVACMode.OFF
     
@@ -99,7 +98,7 @@ class TempRegulator(ClimateEntity, CoordinatorEntity):
     @property
     def target_temperature(self):
         if self.coordinator.data is not None:
-            return self.coordinator.data.get("target_temp")
+            return self.coordinator.data.target_temp
         return None
     
     @property
@@ -126,18 +125,17 @@ class TempRegulator(ClimateEntity, CoordinatorEntity):
             name = NAME,
             model = NAME,
             manufacturer = MANUFACTURER,
-            sw_version = self.coordinator.data.get("firmware_version")
+            sw_version = self.coordinator.library.data.firmware_version
         )
     
     @request    
     async def async_set_fan_mode(self, fan_mode):
-        await self.coordinator.wrapper.set_fan_mode(fan_mode)
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_apply_optimistic(self.coordinator.wrapper.set_fan_mode(fan_mode), fan_mode = fan_mode)
 
     @request
     async def async_set_temperature(self, **kwargs):
-        await self.coordinator.wrapper.set_target_temp(kwargs.get("temperature"))
-        await self.coordinator.async_refresh()
+        temperature = kwargs.get("temperature")
+        await self.coordinator.async_apply_optimistic(self.coordinator.wrapper.set_target_temp(temperature), target_temp = temperature)
 
     async def async_set_hvac_mode(self, hvac_mode):
         if hvac_mode == HVACMode.OFF:
@@ -174,10 +172,11 @@ class TempRegulator(ClimateEntity, CoordinatorEntity):
                         pass
             
             async with self.coordinator.startup_lock:
+                self.coordinator.boost()
                 await self._service_registry.async_call(SCRIPT_DOMAIN, self._turn_on_script, blocking = True)
                 try:
                     await asyncio.wait_for(wait_with_timeout(self), timeout)
-                except (asyncio.TimeoutError, aiohttp.client_exceptions.ClientConnectorError) as e:
+                except asyncio.TimeoutError as e:
                     raise HomeAssistantError(e)
 
             await self.coordinator.async_refresh()
@@ -6,19 +6,24 @@ import asyncio
 import voluptuous as vol
 
 from homeassistant import config_entries, exceptions
-from homeassistant.const import CONF_IP_ADDRESS
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_IP_ADDRESS, CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import SelectSelector, SelectSelectorConfig, SelectSelectorMode
 from homeassistant.helpers.device_registry import format_mac
 
 from .API.PS3MAPI import PS3MAPIWrapper
-from .const import DOMAIN, TURN_ON_SCRIPT
+from .const import (
+    DOMAIN, TURN_ON_SCRIPT, TELEMETRY_UPDATE_INTERVAL, FAST_UPDATE_INTERVAL, MAX_UPDATE_INTERVAL, 
+    CONF_COALESCE_WINDOW, COALESCE_WINDOW, MAX_COALESCE_WINDOW, CONF_STREAMING,
+    CONF_MAX_SOURCES, CONF_MERGE_NOTIFICATIONS
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def validate_input(hass: HomeAssistant, data: dict):
-    wrapper = PS3MAPIWrapper(data[CONF_IP_ADDRESS])
+    wrapper = PS3MAPIWrapper(data[CONF_IP_ADDRESS], session = async_get_clientsession(hass))
 
     try:
         mac_address = format_mac(await wrapper.get_mac_address())
@@ -26,6 +31,8 @@ async def validate_input(hass: HomeAssistant, data: dict):
         await wrapper.send_notification("Home Assistant connection was succesful!")
     except Exception:
         raise CannotConnect
+    finally:
+        await wrapper.close()
 
     return mac_address
 
@@ -33,6 +40,11 @@ async def validate_input(hass: HomeAssistant, data: dict):
 class PS3MAPIConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return PS3MAPIOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input = None):
         """Handle a flow initiated by the user."""
         errors = {}
@@ -65,5 +77,44 @@ class PS3MAPIConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class PS3MAPIOptionsFlow(config_entries.OptionsFlow):
+
+    def __init__(self, config_entry) -> None:
+        self._config_entry = config_entry
+
+    async def async_step_init(self, user_input = None):
+        """Manage the polling options."""
+        if user_input is not None:
+            return self.async_create_entry(title = "", data = user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SCAN_INTERVAL, 
+                        default = self._config_entry.options.get(CONF_SCAN_INTERVAL, TELEMETRY_UPDATE_INTERVAL)
+                    ): vol.All(vol.Coerce(int), vol.Range(min = FAST_UPDATE_INTERVAL, max = MAX_UPDATE_INTERVAL)),
+                    vol.Required(
+                        CONF_COALESCE_WINDOW, 
+                        default = self._config_entry.options.get(CONF_COALESCE_WINDOW, COALESCE_WINDOW)
+                    ): vol.All(vol.Coerce(float), vol.Range(min = 0, max = MAX_COALESCE_WINDOW)),
+                    vol.Required(
+                        CONF_STREAMING, 
+                        default = self._config_entry.options.get(CONF_STREAMING, False)
+                    ): bool,
+                    vol.Required(
+                        CONF_MAX_SOURCES, 
+                        default = self._config_entry.options.get(CONF_MAX_SOURCES, 0)
+                    ): vol.All(vol.Coerce(int), vol.Range(min = 0)),
+                    vol.Required(
+                        CONF_MERGE_NOTIFICATIONS, 
+                        default = self._config_entry.options.get(CONF_MERGE_NOTIFICATIONS, False)
+                    ): bool
+                }
+            ),
+        )
+
+
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -5,6 +5,8 @@ PLATFORMS = ["climate", "number", "media_player"]
 DATA_HASS_CONFIG = "ps3_hass_config"
 CONF_ENTRY_ID = "entry_id"
 ENTRIES = "entries"
+ENGINE = "engine"
+ENGINE_CLOSE_LISTENER = "engine_close_listener"
 MAX_TEMP = 85
 MIN_TEMP = 40
 MAX_FAN_SPEED = 100
@@ -15,4 +17,33 @@ TURN_ON_SCRIPT = 'turn_on_script'
 SCRIPT_DOMAIN = 'script'
 FAN_SPEED_KEY = 'fan_speed'
 MEDIA_PLAYER_KEY = 'media_player'
-SYSTEM_TEMP_KEY = 'system_temp'
\ No newline at end of file
+SYSTEM_TEMP_KEY = 'system_temp'
+TELEMETRY_UPDATE_INTERVAL = 10
+LIBRARY_UPDATE_INTERVAL = 900
+FAST_UPDATE_INTERVAL = 2
+MAX_UPDATE_INTERVAL = 300
+COMMAND_BOOST_DURATION = 30
+TARGET_TEMP_MARGIN = 3
+MEDIA_POSITION_TOLERANCE = 2
+CONF_COALESCE_WINDOW = 'coalesce_window'
+COALESCE_WINDOW = 0.5
+MAX_COALESCE_WINDOW = 5
+CONF_STREAMING = 'streaming'
+CONF_MAX_SOURCES = 'max_sources'
+CONF_MERGE_NOTIFICATIONS = 'merge_notifications'
+BROWSE_LIBRARY = 'library'
+BROWSE_PAGE_SIZE = 100
+MAX_CONCURRENT_POLLS = 8
+POLL_SPACING = 0.1
+STAGGER_WINDOW = 2
+LATENCY_SAMPLES = 100
+MAX_CONCURRENT_NOTIFICATIONS = 8
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+ART_MEMORY_LIMIT = 8 * 1024 * 1024
+ART_DISK_LIMIT = 2000
+ART_FETCH_TIMEOUT = 10
+SERVICE_SEND_COMMANDS = 'send_commands'
+ATTR_COMMANDS = 'commands'
+ATTR_ACTION = 'action'
+BATCH_ACTIONS = ['notify', 'press_button', 'beep', 'fan_mode', 'target_temp', 'fan_speed', 'exit_to_xmb', 'mount_gamefile', 'mount_disc']
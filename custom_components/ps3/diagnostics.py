@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, ENTRIES, ENGINE
+
+TO_REDACT = {"mac_address"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    coordinator = hass.data[DOMAIN][ENTRIES][entry.entry_id]["coordinator"]
+    engine = hass.data[DOMAIN][ENGINE]
+    library = coordinator.library.data
+
+    return {
+        "entry": async_redact_data({"data": dict(entry.data), "options": dict(entry.options)}, TO_REDACT),
+        "telemetry": asdict(coordinator.data) if coordinator.data is not None else None,
+        "library": {
+            "games": len(library.games) if library is not None and library.games is not None else None,
+            "firmware_version": library.firmware_version if library is not None else None
+        },
+        "update_interval": coordinator.update_interval.total_seconds(),
+        "pending_commands": coordinator.wrapper.pending_commands,
+        "latency": engine.stats(entry.entry_id),
+        "engine": {
+            "consoles": engine.consoles,
+            "max_concurrent_polls": engine.max_concurrent,
+            "poll_spacing": engine.spacing
+        }
+    }
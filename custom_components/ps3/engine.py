@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from time import monotonic
+
+from .API.PS3MAPI import create_session, CONNECTION_LIMIT
+from .const import MAX_CONCURRENT_POLLS, POLL_SPACING, STAGGER_WINDOW, LATENCY_SAMPLES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LatencyStats:
+    """Durations of the most recent polls of one kind for one console."""
+
+    __slots__ = ("samples", "polls", "failures")
+
+    def __init__(self, size: int = LATENCY_SAMPLES):
+        self.samples = deque(maxlen = size)
+        self.polls = 0
+        self.failures = 0
+
+    def record(self, duration: float, success: bool):
+        self.samples.append(duration)
+        self.polls += 1
+        if not success:
+            self.failures += 1
+
+    def as_dict(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def percentile(share):
+            return round(ordered[min(len(ordered) - 1, int(share * len(ordered)))] * 1000, 1) if ordered else None
+
+        return {
+            "polls": self.polls,
+            "failures": self.failures,
+            "last_ms": round(self.samples[-1] * 1000, 1) if self.samples else None,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(ordered[-1] * 1000, 1) if ordered else None
+        }
+
+
+class PollingEngine:
+    """Polling shared by all consoles: one connection pool, a bound on concurrent scrapes and staggered poll starts."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_POLLS, spacing: float = POLL_SPACING):
+        self.max_concurrent = max_concurrent
+        self.spacing = spacing
+        self.session = create_session(limit = 0, limit_per_host = CONNECTION_LIMIT)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._next_start = 0.0
+        self._consoles = {}
+
+    def register(self, entry_id: str):
+        self._consoles[entry_id] = {}
+
+    def unregister(self, entry_id: str) -> bool:
+        """Forget a console. Returns True when it was the last one, the caller then closes the engine."""
+        self._consoles.pop(entry_id, None)
+        return not self._consoles
+
+    async def async_close(self):
+        if not self.session.closed:
+            await self.session.close()
+
+    @property
+    def consoles(self) -> int:
+        return len(self._consoles)
+
+    @asynccontextmanager
+    async def poll(self, entry_id: str, kind: str):
+        """Wait for a free slot, then time the scrape run inside the context."""
+        async with self._semaphore:
+            # Spread the poll starts, so consoles whose timers line up are not all scraped at once.
+            # With many consoles the spacing shrinks, so one round of polls still starts within the stagger window
+            spacing = min(self.spacing, STAGGER_WINDOW / max(1, len(self._consoles)))
+            now = monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + spacing
+            if start > now:
+                await asyncio.sleep(start - now)
+
+            began = monotonic()
+            success = False
+            try:
+                yield
+                success = True
+            finally:
+                stats = self._consoles.get(entry_id)
+                if stats is not None:
+                    stats.setdefault(kind, LatencyStats()).record(monotonic() - began, success)
+
+    def stats(self, entry_id: str) -> dict:
+        return {kind: stats.as_dict() for kind, stats in self._consoles.get(entry_id, {}).items()}
@@ -1,6 +1,8 @@
 from functools import wraps
 
+from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .API.exceptions import DeviceOffError, LockError
@@ -8,9 +10,12 @@ from .API.exceptions import DeviceOffError, LockError
 
 def request(func):
     @wraps(func)
-    async def wrapper(*args, **kwargs):
+    async def wrapper(self, *args, **kwargs):
+        # Poll quickly for a while so the result of the command shows up soon
+        self.coordinator.boost()
+
         try:
-            await func(*args, **kwargs)
+            await func(self, *args, **kwargs)
 
         except DeviceOffError:
             raise ServiceValidationError(
@@ -27,4 +32,29 @@ def request(func):
         except Exception as e:
             raise HomeAssistantError(e) 
         
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+class SnapshotEntity(CoordinatorEntity):
+    """Coordinator entity that only writes its state when a snapshot field it shows changed."""
+
+    # Fields of the telemetry and library snapshots the state and attributes of the entity are built from
+    _snapshot_fields = frozenset()
+    _library_fields = frozenset()
+
+    _written = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        data = self.coordinator.data
+        library = self.coordinator.library.data
+        written = self._written
+
+        if (
+            written is None
+            or written[0] != self.available
+            or (data is not None and data.changed(written[1]) & self._snapshot_fields)
+            or (library is not None and library.changed(written[2]) & self._library_fields)
+        ):
+            self._written = (self.available, data, library)
+            self.async_write_ha_state()
@@ -2,22 +2,35 @@ from __future__ import annotations
 
 import logging
 import asyncio
-import aiohttp
+import re
+from itertools import islice
 
-from homeassistant.components.media_player import MediaPlayerEntity, MediaType, MediaPlayerState, MediaPlayerEntityFeature
+import voluptuous as vol
+
+from homeassistant.components.media_player import (
+    MediaPlayerEntity, MediaType, MediaPlayerState, MediaPlayerEntityFeature, MediaClass, BrowseMedia
+)
+from homeassistant.components.media_player.errors import BrowseError
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.entity_platform import AddEntitiesCallback, async_get_current_platform
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.util.dt import utcnow
 
-from .const import DOMAIN, ENTRIES, XMB_SOURCE, SCRIPT_DOMAIN, TURN_ON_SCRIPT, MEDIA_PLAYER_KEY, NAME, MANUFACTURER
-from .helpers import request
+from .const import (
+    DOMAIN, ENTRIES, XMB_SOURCE, SCRIPT_DOMAIN, TURN_ON_SCRIPT, MEDIA_PLAYER_KEY, NAME, MANUFACTURER, 
+    SERVICE_SEND_COMMANDS, ATTR_COMMANDS, ATTR_ACTION, BATCH_ACTIONS, BROWSE_LIBRARY, BROWSE_PAGE_SIZE
+)
+from .helpers import request, SnapshotEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Title IDs are four letters and five digits, e.g. BLUS30443
+TITLE_ID = re.compile(r'(?<![A-Z0-9])[A-Z]{4}\d{5}(?![0-9])')
+
+COMMAND_SCHEMA = vol.Schema({vol.Required(ATTR_ACTION): vol.In(BATCH_ACTIONS)}, extra = vol.ALLOW_EXTRA)
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -27,7 +40,17 @@ async def async_setup_entry(
         [MediaPlayer(hass.data[DOMAIN][ENTRIES][config_entry.entry_id]["coordinator"], config_entry.data.get(TURN_ON_SCRIPT), hass.services, config_entry.data.get('mac_address'))]
     )
 
-class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
+    async_get_current_platform().async_register_entity_service(
+        SERVICE_SEND_COMMANDS,
+        {vol.Required(ATTR_COMMANDS): vol.All(cv.ensure_list, [COMMAND_SCHEMA])},
+        "async_send_commands"
+    )
+
+class MediaPlayer(MediaPlayerEntity, SnapshotEntity):
+    _snapshot_fields = frozenset({"state", "media_session", "mounted_gamefile", "media_position_updated_at"})
+    _library_fields = frozenset({"sources", "game_names"})
+    # Cover art is served from the art cache through Home Assistant, the console is not reachable from outside the LAN
+    _attr_media_image_remotely_accessible = False
      
     def __init__(self, coordinator, turn_on_script, service_registry, mac_address):
         super().__init__(coordinator)
@@ -36,6 +59,7 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
         self._attr_supported_features = (
             MediaPlayerEntityFeature.PLAY
             | MediaPlayerEntityFeature.PLAY_MEDIA
+            | MediaPlayerEntityFeature.BROWSE_MEDIA
             | MediaPlayerEntityFeature.STOP
             | MediaPlayerEntityFeature.SELECT_SOURCE
             | MediaPlayerEntityFeature.TURN_OFF
@@ -43,6 +67,11 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
         )
         self._mac_address = mac_address
 
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        # The source list is read from the slow library tier
+        self.async_on_remove(self.coordinator.library.async_add_listener(self._handle_coordinator_update))
+
     @property
     def name(self):
         return "PS3"
@@ -50,7 +79,7 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
     @property
     def media_content_id(self):
         if self.coordinator.data is not None:
-            media_session = self.coordinator.data.get("media_session")
+            media_session = self.coordinator.data.media_session
             if media_session and media_session.get("media_type") == "game":
                 return media_session.get("game_id")
         return None
@@ -58,7 +87,7 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
     @property
     def media_title(self):
         if self.coordinator.data is not None:
-            media_session = self.coordinator.data.get("media_session")
+            media_session = self.coordinator.data.media_session
             if media_session and media_session.get("media_type") == "game":
                 return media_session.get("game_title")
         return None
@@ -66,7 +95,7 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
     @property
     def content_type(self):
         if self.coordinator.data is not None:
-            media_session = self.coordinator.data.get("media_session")
+            media_session = self.coordinator.data.media_session
             if media_session:
                 if media_session.get("media_type") == "game":
                     return MediaType.GAME
@@ -77,33 +106,26 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
     @property
     def media_position(self):
         if self.coordinator.data is not None:
-            media_session = self.coordinator.data.get("media_session")
+            media_session = self.coordinator.data.media_session
             if media_session:
-                playback_time = media_session.get("playback_time")
-                h, m, s = playback_time.split(":")
-                seconds = int(h) * 3600 + int(m) * 60 + int(s)
-                return seconds
+                return media_session.get("playback_seconds")
         return None
     
     @property
     def media_duration(self):
-        if self.coordinator.data is not None:
-            media_session = self.coordinator.data.get("media_session")
-            if media_session:
-                playback_time = media_session.get("playback_time")
-                h, m, s = playback_time.split(":")
-                seconds = int(h) * 3600 + int(m) * 60 + int(s)
-                return seconds
+        # The console only reports the time played, not how long the media is
         return None
     
     @property
     def media_position_updated_at(self):
-        return utcnow()
+        if self.coordinator.data is not None:
+            return self.coordinator.data.media_position_updated_at
+        return None
     
     @property
     def state(self):
-        if self.coordinator.data is not None and self.coordinator.data.get('state') == 'On':
-            media_session = self.coordinator.data.get("media_session")
+        if self.coordinator.data is not None and self.coordinator.data.state == 'On':
+            media_session = self.coordinator.data.media_session
             if media_session:
                 return MediaPlayerState.PLAYING
             else:
@@ -112,34 +134,54 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
     
     @property
     def source_list(self):
-        if self.coordinator.data is not None:
-            games_dict = self.coordinator.data.get("games")
-            if games_dict is not None:
-                games_list = list(games_dict.keys())
-                games_list.append(XMB_SOURCE)
-                return games_list
-            else:
-                return [XMB_SOURCE]
+        if self.coordinator.library.data is not None:
+            return self.coordinator.library.data.sources
         return None
     
     @property
     def source(self):
         if self.coordinator.data is not None:
-            mounted_gamefile = self.coordinator.data.get("mounted_gamefile")
+            mounted_gamefile = self.coordinator.data.mounted_gamefile
             if mounted_gamefile is not None:
-                games_dict = {link: name for name, link in self.coordinator.data.get("games").items()}
-                return games_dict[mounted_gamefile]
+                game_names = self.coordinator.library.data.game_names
+                return game_names.get(mounted_gamefile) if game_names is not None else None
             return XMB_SOURCE
         return None
     
     @property
     def media_image_url(self):
         if self.coordinator.data is not None:
-            media_session = self.coordinator.data.get("media_session")
+            media_session = self.coordinator.data.media_session
             if media_session:
-                if media_session.get("media_type") == "game":
-                    return f"http://{self.coordinator.ip_address}{media_session.get('image')}"
+                return media_session.get("image_url")
         return None
+
+    @property
+    def media_image_hash(self):
+        # The art of a game never changes, so the browser may cache it by game
+        if self.coordinator.data is not None:
+            media_session = self.coordinator.data.media_session
+            if media_session:
+                return media_session.get("game_id") or media_session.get("image_url")
+        return None
+
+    async def async_get_media_image(self):
+        if self.coordinator.data is None or not self.coordinator.data.media_session:
+            return None, None
+
+        media_session = self.coordinator.data.media_session
+        art = self.coordinator.library.art
+        key = media_session.get("game_id") or media_session.get("image_url")
+        if key is None:
+            return None, None
+
+        image, content_type = await art.async_get(key)
+        if image is None and self.coordinator.data.mounted_gamefile is not None:
+            # Prefetched from the library, stored by game link
+            image, content_type = await art.async_get(self.coordinator.data.mounted_gamefile)
+        if image is None and media_session.get("image_url") is not None:
+            image, content_type = await art.async_get(key, media_session["image_url"])
+        return image, content_type
     
     @property
     def icon(self):
@@ -161,7 +203,7 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
             name = NAME,
             model = NAME,
             manufacturer = MANUFACTURER,
-            sw_version = self.coordinator.data.get("firmware_version")
+            sw_version = self.coordinator.library.data.firmware_version
         )
     
     @request
@@ -170,9 +212,7 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
 
     @request
     async def async_media_stop(self):
-        self.coordinator.update_from_memory = True
         await self.coordinator.wrapper.quit_playback()
-        await self.coordinator.async_refresh()
 
     @request
     async def async_select_source(self, source):
@@ -182,6 +222,102 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
             await self.coordinator.wrapper.mount_gamefile(source)
         _LOGGER.info("Game mounted!")
 
+    async def async_browse_media(self, media_content_type = None, media_content_id = None):
+        games = self.coordinator.library.data.games if self.coordinator.library.data is not None else None
+        if not games:
+            raise BrowseError("The game library has not been read yet")
+
+        if media_content_id in (None, BROWSE_LIBRARY):
+            if len(games) <= BROWSE_PAGE_SIZE:
+                return self._browse_directory(BROWSE_LIBRARY, "Games", [self._browse_game(name, link) for name, link in games.items()])
+
+            # Pages are listed by their first and last game, their games are only loaded when a page is opened
+            names = list(games)
+            pages = [
+                self._browse_directory(f"{BROWSE_LIBRARY}/{start // BROWSE_PAGE_SIZE}", f"{names[start]} - {names[min(start + BROWSE_PAGE_SIZE, len(names)) - 1]}")
+                for start in range(0, len(names), BROWSE_PAGE_SIZE)
+            ]
+            return self._browse_directory(BROWSE_LIBRARY, "Games", pages, MediaClass.DIRECTORY)
+
+        page = media_content_id.removeprefix(f"{BROWSE_LIBRARY}/")
+        if not page.isdigit():
+            raise BrowseError(f"Unknown media {media_content_id}")
+
+        start = int(page) * BROWSE_PAGE_SIZE
+        children = [self._browse_game(name, link) for name, link in islice(games.items(), start, start + BROWSE_PAGE_SIZE)]
+        if not children:
+            raise BrowseError(f"Unknown media {media_content_id}")
+        return self._browse_directory(media_content_id, f"{children[0].title} - {children[-1].title}", children)
+
+    @staticmethod
+    def _browse_directory(content_id, title, children = None, children_media_class = MediaClass.GAME):
+        return BrowseMedia(
+            media_class = MediaClass.DIRECTORY,
+            media_content_id = content_id,
+            media_content_type = BROWSE_LIBRARY,
+            title = title,
+            can_play = False,
+            can_expand = True,
+            children = children,
+            children_media_class = children_media_class
+        )
+
+    @staticmethod
+    def _browse_game(name, link):
+        return BrowseMedia(
+            media_class = MediaClass.GAME,
+            media_content_id = link,
+            media_content_type = MediaType.GAME,
+            title = name,
+            can_play = True,
+            can_expand = False
+        )
+
+    def _find_game(self, media_id):
+        """Name of the game with the given link, name or title ID."""
+        library = self.coordinator.library.data
+        if library is None or not library.games:
+            return None
+        if media_id in library.game_names:
+            return library.game_names[media_id]
+        if media_id in library.games:
+            return media_id
+
+        # Game folders usually carry the title ID, only use it when exactly one game has it
+        title_id = media_id.upper()
+        if not TITLE_ID.fullmatch(title_id):
+            return None
+        matches = [name for name, link in library.games.items() if title_id in TITLE_ID.findall(link.upper())]
+        return matches[0] if len(matches) == 1 else None
+
+    async def async_play_media(self, media_type, media_id, **kwargs):
+        game = self._find_game(media_id)
+        if game is None:
+            raise ServiceValidationError(f"Game {media_id} not found in the library")
+
+        await self._async_play_game(game)
+
+    @request
+    async def _async_play_game(self, game):
+        await self.coordinator.wrapper.mount_gamefile(game)
+        await self.coordinator.wrapper.start_playback()
+
+    async def async_send_commands(self, commands):
+        batch = self.coordinator.wrapper.batch()
+        for command in commands:
+            params = {key: value for key, value in command.items() if key != ATTR_ACTION}
+            try:
+                getattr(batch, command[ATTR_ACTION])(**params)
+            except Exception as e:
+                raise ServiceValidationError(f"Invalid command {command[ATTR_ACTION]} with {params}: {e}")
+
+        await self._async_send_batch(batch)
+
+    @request
+    async def _async_send_batch(self, batch):
+        await batch.execute()
+        await self.coordinator.async_refresh()
+
     @request
     async def async_turn_off(self):
         await self.coordinator.wrapper.shutdown()
@@ -204,10 +340,11 @@ class MediaPlayer(MediaPlayerEntity, CoordinatorEntity):
                         pass
             
             async with self.coordinator.startup_lock:
+                self.coordinator.boost()
                 await self._service_registry.async_call(SCRIPT_DOMAIN, self._turn_on_script, blocking = True)
                 try:
                     await asyncio.wait_for(wait_with_timeout(self), timeout)
-                except (asyncio.TimeoutError, aiohttp.client_exceptions.ClientConnectorError) as e:
+                except asyncio.TimeoutError as e:
                     raise HomeAssistantError(e)
 
             await self.coordinator.async_refresh()
\ No newline at end of file
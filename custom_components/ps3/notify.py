@@ -1,6 +1,7 @@
 """PS3 Notify service."""
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from collections import defaultdict
@@ -10,11 +11,23 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
-from .const import DOMAIN, ENTRIES
+from .const import DOMAIN, ENTRIES, MAX_CONCURRENT_NOTIFICATIONS
 from .API.exceptions import DeviceOffError, LockError
 
 _LOGGER = logging.getLogger(__name__)
 
+DELIVERED = "delivered"
+OFF = "off"
+BUSY = "busy"
+UNKNOWN = "unknown"
+FAILED = "failed"
+
+OUTCOME_DESCRIPTIONS = {
+    OFF: "turned off",
+    BUSY: "waiting for another request to finish",
+    UNKNOWN: "not a known ip address of a registered PlayStation® 3 device",
+}
+
 
 async def async_get_service(
     hass: HomeAssistant,
@@ -25,16 +38,19 @@ async def async_get_service(
     if discovery_info is None:
         return None
 
-    wrapper_dict = {entry['coordinator'].ip_address: entry['coordinator'].wrapper for entry in hass.data[DOMAIN][ENTRIES].values()}
-    return PS3NotificationService(wrapper_dict)
+    return PS3NotificationService(hass)
 
 
 class PS3NotificationService(BaseNotificationService):
     """Implement the notification service for the PS3."""
 
-    def __init__(self, wrapper_dict) -> None:
+    def __init__(self, hass: HomeAssistant) -> None:
         """Initialize the service."""
-        self.wrapper_dict= wrapper_dict
+        self.hass = hass
+
+    def _wrappers(self) -> dict:
+        # Looked up on every call, entries that were reloaded since the service was created have new wrappers
+        return {entry['coordinator'].ip_address: entry['coordinator'].wrapper for entry in self.hass.data[DOMAIN][ENTRIES].values()}
 
     async def async_send_message(self, message="", **kwargs):
         """Send a message."""
@@ -45,23 +61,44 @@ class PS3NotificationService(BaseNotificationService):
 
         if not targets:
             _LOGGER.error("No targets specified for PS3 notify service")
+            return
+
+        if data:
+            data_dict = defaultdict(lambda: 1, data)
+            icon, sound = data_dict['icon'], data_dict['sound']
         else:
-            for target in targets:
-                try:
-                    if data:
-                        data_dict = defaultdict(lambda: 1, data)
-                        await self.wrapper_dict[target].send_notification(message, icon = data_dict['icon'], sound = data_dict['sound'])
-                    else:
-                        await self.wrapper_dict[target].send_notification(message)
+            icon, sound = 1, 1
 
-                except KeyError:
-                    raise ServiceValidationError(f"{target} is not a known ip address of a registered PlayStation® 3 device")
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_NOTIFICATIONS)
+        wrappers = self._wrappers()
 
+        async def send(target):
+            if target not in wrappers:
+                return UNKNOWN, None
+
+            async with semaphore:
+                try:
+                    await wrappers[target].send_notification(message, icon = icon, sound = sound)
                 except DeviceOffError:
-                    raise ServiceValidationError(f"Device {target} is turned off")
-        
+                    return OFF, None
                 except LockError:
-                    raise ServiceValidationError(f"Device {target} waiting for another request to finish")
-
+                    return BUSY, None
                 except Exception as e:
-                    raise HomeAssistantError(e)
\ No newline at end of file
+                    return FAILED, e
+            return DELIVERED, None
+
+        # Every target gets its own attempt, one console that is off does not hold up or cancel the others
+        outcomes = dict(zip(targets, await asyncio.gather(*(send(target) for target in targets))))
+        _LOGGER.debug("Notification outcomes: %s", {target: outcome for target, (outcome, _) in outcomes.items()})
+
+        failures = {target: (outcome, error) for target, (outcome, error) in outcomes.items() if outcome != DELIVERED}
+        if not failures:
+            return
+
+        summary = ", ".join(
+            f"{target} ({error if outcome == FAILED else OUTCOME_DESCRIPTIONS[outcome]})" for target, (outcome, error) in failures.items()
+        )
+        delivered = len(outcomes) - len(failures)
+        if any(outcome == FAILED for outcome, _ in failures.values()):
+            raise HomeAssistantError(f"Notification delivered to {delivered} of {len(outcomes)} devices, failed for {summary}")
+        raise ServiceValidationError(f"Notification delivered to {delivered} of {len(outcomes)} devices, not delivered to {summary}")
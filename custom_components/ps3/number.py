@@ -6,13 +6,12 @@ from homeassistant.components.number import NumberEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import PERCENTAGE
 
 from .const import DOMAIN, ENTRIES, MAX_FAN_SPEED, MIN_FAN_SPEED, FAN_SPEED_INCREASE, FAN_SPEED_KEY, NAME, MANUFACTURER
-from .helpers import request
+from .helpers import request, SnapshotEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,7 +25,9 @@ async def async_setup_entry(
         [FanSpeed(hass.data[DOMAIN][ENTRIES][config_entry.entry_id]["coordinator"], config_entry.data.get('mac_address'))]
     )
 
-class FanSpeed(NumberEntity, CoordinatorEntity):
+class FanSpeed(NumberEntity, SnapshotEntity):
+    _snapshot_fields = frozenset({"fan_speed"})
+
     def __init__(self, coordinator, mac_address):
         super().__init__(coordinator)
         self._mac_address = mac_address
@@ -50,7 +51,7 @@ class FanSpeed(NumberEntity, CoordinatorEntity):
     @property
     def native_value(self):
         if self.coordinator.data is not None:
-            return self.coordinator.data.get("fan_speed")
+            return self.coordinator.data.fan_speed
         return None
     
     @property
@@ -77,11 +78,16 @@ class FanSpeed(NumberEntity, CoordinatorEntity):
             name = NAME,
             model = NAME,
             manufacturer = MANUFACTURER,
-            sw_version = self.coordinator.data.get("firmware_version")
+            sw_version = self.coordinator.library.data.firmware_version
         )
     
     @request
     async def async_set_native_value(self, fan_speed: int):
-        await self.coordinator.wrapper.set_fan_speed(fan_speed)
-        await self.coordinator.async_refresh()
+        # Setting the fan speed also switches the console to manual fan mode
+        await self.coordinator.async_apply_optimistic(
+            self.coordinator.wrapper.set_fan_speed(fan_speed), 
+            fan_speed = fan_speed, 
+            fan_mode = 'Manual', 
+            target_temp = None
+        )
 
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+
+
+class Snapshot:
+    """Base of the immutable coordinator data, compared field by field."""
+
+    __slots__ = ()
+
+    def changed(self, other: Snapshot | None) -> frozenset[str]:
+        """Names of the fields that differ from other, all of them when there is no other snapshot."""
+        if other is None:
+            return frozenset(self.__slots__)
+        if other is self:
+            return frozenset()
+        return frozenset(field for field in self.__slots__ if getattr(self, field) != getattr(other, field))
+
+
+@dataclass(frozen = True, slots = True)
+class PS3Snapshot(Snapshot):
+    """Telemetry of one poll."""
+
+    state: str | None = None
+    cpu_temp: float | None = None
+    rsx_temp: float | None = None
+    fan_speed: int | None = None
+    fan_mode: str | None = None
+    target_temp: float | None = None
+    media_session: dict | None = None
+    mounted_gamefile: str | None = None
+    media_position_updated_at: datetime | None = None
+    update_interval: float | None = None
+
+
+@dataclass(frozen = True, slots = True)
+class PS3Library(Snapshot):
+    """Game library and static information. The games mappings and the source list are shared until the library changes."""
+
+    games: MappingProxyType | None = None
+    game_names: MappingProxyType | None = None
+    sources: list[str] | None = None
+    images: MappingProxyType | None = None
+    firmware_version: str | None = None
+    mac_address: str | None = None
@@ -0,0 +1,173 @@
+"""Benchmarks for the scrape, parse and refresh hot paths of the integration.
+
+Runs against pages rendered by the webMAN simulator (or pages recorded from a real console) and
+against simulated consoles on localhost, e.g.
+
+    python tools/benchmark.py --games 10 100 1000 5000 --rounds 50 --save baseline.json
+    python tools/benchmark.py --games 10 100 1000 5000 --rounds 50 --compare baseline.json
+
+Reports latency percentiles, CPU time and allocated memory per operation. With --compare the
+script exits with status 1 when the median latency of a case got more than --tolerance slower.
+The simulated consoles run in the same process, so the CPU time of the HTTP cases includes the
+simulator's share.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "custom_components" / "ps3"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+# The API package does not depend on Home Assistant, so it can be imported on its own
+from API import parsers  # noqa: E402
+from API.PS3MAPI import PS3MAPIWrapper  # noqa: E402
+from webman_simulator import SimulatedConsole, render_cpursx, render_index  # noqa: E402
+
+ALLOCATION_ROUNDS = 5
+
+
+def percentile(samples: list[float], share: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+async def measure(func, rounds: int) -> dict:
+    """Run the coroutine function func rounds times and collect its timings and allocations."""
+    await func()
+
+    wall = []
+    cpu = []
+    for _ in range(rounds):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        await func()
+        cpu.append(time.process_time() - cpu_start)
+        wall.append(time.perf_counter() - wall_start)
+
+    # Allocation tracing slows everything down, so it gets separate rounds
+    peaks = []
+    blocks = []
+    for _ in range(ALLOCATION_ROUNDS):
+        tracemalloc.start()
+        await func()
+        snapshot = tracemalloc.take_snapshot()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        blocks.append(sum(stat.count for stat in snapshot.statistics("filename")))
+
+    return {
+        "p50_ms": percentile(wall, 0.5) * 1000,
+        "p90_ms": percentile(wall, 0.9) * 1000,
+        "p99_ms": percentile(wall, 0.99) * 1000,
+        "cpu_ms": statistics.mean(cpu) * 1000,
+        "peak_kib": max(peaks) / 1024,
+        "live_blocks": int(statistics.mean(blocks)),
+    }
+
+
+def load_pages(fixtures: Path | None, games: int) -> tuple[str, str]:
+    if fixtures is not None:
+        return (fixtures / "cpursx.html").read_text(), (fixtures / "index.html").read_text()
+
+    console = SimulatedConsole(games = games)
+    console.mounted_gamefile = next(iter(console.games.values()), None)
+    console.playing = console.mounted_gamefile is not None
+    return render_cpursx(console), render_index(console)
+
+
+async def run(args) -> dict:
+    results = {}
+    sizes = [None] if args.fixtures else args.games
+
+    for games in sizes:
+        label = "fixture" if games is None else str(games)
+        cpursx_html, index_html = load_pages(args.fixtures, games or 0)
+        wrapper = PS3MAPIWrapper("127.0.0.1")
+
+        async def parse_telemetry():
+            wrapper._parse_telemetry(cpursx_html, static_info = True)
+
+        async def parse_games():
+            wrapper._parse_games(index_html)
+
+        async def soup_parse_telemetry():
+            parsers.soup_parse_telemetry(cpursx_html, static_info = True)
+
+        async def soup_parse_games():
+            parsers.soup_parse_games(index_html)
+
+        results[f"parse cpursx.ps3 [{label}]"] = await measure(parse_telemetry, args.rounds)
+        results[f"parse index.ps3 [{label}]"] = await measure(parse_games, args.rounds)
+        results[f"BeautifulSoup cpursx.ps3 [{label}]"] = await measure(soup_parse_telemetry, args.rounds)
+        results[f"BeautifulSoup index.ps3 [{label}]"] = await measure(soup_parse_games, args.rounds)
+
+        if games is None:
+            continue
+
+        console = SimulatedConsole(port = args.port, games = games, latency = args.latency)
+        await console.power_on()
+        wrapper = PS3MAPIWrapper(console.address)
+        streaming_wrapper = PS3MAPIWrapper(console.address, streaming = True)
+
+        try:
+            # update_telemetry and update are what the telemetry and library coordinators call on each poll
+            results[f"_call_service popup [{label}]"] = await measure(lambda: wrapper._send_popup("Benchmark"), args.rounds)
+            results[f"telemetry refresh [{label}]"] = await measure(wrapper.update_telemetry, args.rounds)
+            results[f"library refresh [{label}]"] = await measure(wrapper.update, args.rounds)
+            results[f"streaming telemetry refresh [{label}]"] = await measure(streaming_wrapper.update_telemetry, args.rounds)
+            results[f"streaming library refresh [{label}]"] = await measure(streaming_wrapper.update, args.rounds)
+        finally:
+            await wrapper.close()
+            await streaming_wrapper.close()
+            await console.power_off()
+
+    return results
+
+
+def report(results: dict, baseline: dict | None, tolerance: float) -> bool:
+    columns = ["p50_ms", "p90_ms", "p99_ms", "cpu_ms", "peak_kib", "live_blocks"]
+    width = max(len(case) for case in results)
+    print(f"{'case':<{width}}  " + "  ".join(f"{column:>11}" for column in columns))
+
+    regressed = False
+    for case, values in results.items():
+        line = f"{case:<{width}}  " + "  ".join(f"{values[column]:>11,.2f}" if isinstance(values[column], float) else f"{values[column]:>11,}" for column in columns)
+        if baseline is not None and case in baseline:
+            change = values["p50_ms"] / baseline[case]["p50_ms"] - 1
+            line += f"  {change:+.0%}"
+            if change > tolerance:
+                line += "  REGRESSION"
+                regressed = True
+        print(line)
+
+    return not regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("--games", type = int, nargs = "+", default = [10, 100, 1000, 5000], help = "Library sizes to benchmark")
+    parser.add_argument("--rounds", type = int, default = 50)
+    parser.add_argument("--latency", type = float, default = 0.0, help = "Simulated webMAN response delay in seconds")
+    parser.add_argument("--port", type = int, default = 8399)
+    parser.add_argument("--fixtures", type = Path, help = "Directory with cpursx.html and index.html recorded from a real console")
+    parser.add_argument("--save", type = Path, help = "Write the results as JSON to this file")
+    parser.add_argument("--compare", type = Path, help = "JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type = float, default = 0.2, help = "Allowed median slowdown before a case counts as regression")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    ok = report(results, baseline, args.tolerance)
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent = 2))
+
+    sys.exit(0 if ok else 1)
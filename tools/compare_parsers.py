@@ -0,0 +1,102 @@
+"""Differential check of the fast and streaming extractors against the BeautifulSoup parser.
+
+All parsers are run on pages rendered by the webMAN simulator in many different console states,
+and on any pages recorded from a real console passed on the command line, e.g.
+
+    python tools/compare_parsers.py recorded/cpursx.html recorded/index.html
+
+Files are treated as index.ps3 pages when their name contains "index", otherwise as cpursx.ps3
+pages. The streaming parsers are fed in small chunks so that tags and text get split between
+them. The script exits with status 1 when a parser disagrees with BeautifulSoup on any page.
+"""
+from __future__ import annotations
+
+import itertools
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "custom_components" / "ps3"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from API import parsers, streaming  # noqa: E402
+from webman_simulator import SimulatedConsole, render_cpursx, render_index  # noqa: E402
+
+# Small and odd, so chunk boundaries fall everywhere inside tags, attributes and entities
+CHUNK_SIZE = 7
+
+GAME_NAMES = ["Game 0000", "Tom & Jerry", "Tom &amp; Jerry", "Ratchet: 'Quest' \"for\" Booty", "Café <Demo>", ""]
+
+
+def simulated_pages():
+    console = SimulatedConsole(games = 0)
+    console.games = {name: f"/mount.ps3/dev_hdd0/PS3ISO/{name}.iso" for name in GAME_NAMES}
+
+    states = itertools.product(['Dynamic', 'Manual', 'Auto', 'SYSCON'], [None, *console.games.values()], [False, True], [0, 59, 3661])
+    for fan_mode, mounted_gamefile, playing, playback_seconds in states:
+        console.fan_mode = fan_mode
+        console.mounted_gamefile = mounted_gamefile
+        console.playing = playing
+        console.playback_seconds = playback_seconds
+        yield f"cpursx {fan_mode} {mounted_gamefile} {playing} {playback_seconds}", "cpursx", render_cpursx(console)
+
+    for size in [0, 1, 10, 1000]:
+        console = SimulatedConsole(games = size)
+        yield f"index {size} games", "index", render_index(console)
+
+    console.games = {name: f"/mount.ps3/dev_hdd0/PS3ISO/{name}.iso" for name in GAME_NAMES}
+    yield "index special names", "index", render_index(console)
+
+
+def recorded_pages(paths: list[str]):
+    for path in map(Path, paths):
+        yield str(path), "index" if "index" in path.name else "cpursx", path.read_text(errors = "replace")
+
+
+def chunks(html: str):
+    return (html[start:start + CHUNK_SIZE] for start in range(0, len(html), CHUNK_SIZE))
+
+
+def stream_parse_games(html: str) -> dict | None:
+    parser = streaming.GameStreamParser()
+    games = {name: link for chunk in chunks(html) for name, link in parser.games(chunk)}
+    games.update(parser.close())
+    return games or None
+
+
+def stream_parse_telemetry(html: str) -> dict:
+    parser = streaming.TelemetryStreamParser(static_info = True)
+    for chunk in chunks(html):
+        parser.feed(chunk)
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser.telemetry()
+
+
+def compare(kind: str, html: str) -> tuple:
+    if kind == "index":
+        return parsers.fast_parse_games(html) or None, stream_parse_games(html), parsers.soup_parse_games(html)
+
+    soup = parsers.soup_parse_telemetry(html, static_info = True)
+    return parsers.fast_parse_telemetry(html, static_info = True), stream_parse_telemetry(html), soup
+
+
+if __name__ == "__main__":
+    pages = 0
+    failures = 0
+
+    for name, kind, html in itertools.chain(simulated_pages(), recorded_pages(sys.argv[1:])):
+        pages += 1
+        fast, stream, soup = compare(kind, html)
+        # The fast extractor may hand a page over to BeautifulSoup, but must never return a different result
+        if fast is not None and fast != soup:
+            failures += 1
+            print(f"MISMATCH {name}\n  fast: {fast}\n  soup: {soup}")
+        if stream != soup:
+            failures += 1
+            print(f"MISMATCH {name}\n  stream: {stream}\n  soup: {soup}")
+
+    print(f"{pages} pages compared, {failures} mismatches")
+    sys.exit(1 if failures else 0)
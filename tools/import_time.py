@@ -0,0 +1,91 @@
+"""Import-time benchmark of the integration.
+
+Imports each module in a fresh interpreter with -X importtime, e.g.
+
+    python tools/import_time.py --rounds 20 --budget 30
+
+Modules that Home Assistant has loaded before any integration (aiohttp, voluptuous and the
+homeassistant package itself) are imported first, so only the cost added by the integration is
+measured. The script exits with status 1 when a module takes longer than --budget milliseconds or
+pulls in one of the parser backends that must only be loaded on first use.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "API.PS3MAPI",
+    "custom_components.ps3",
+    "custom_components.ps3.config_flow",
+    "custom_components.ps3.climate",
+    "custom_components.ps3.number",
+    "custom_components.ps3.media_player",
+    "custom_components.ps3.notify",
+]
+PRELOADED = ["asyncio", "aiohttp", "voluptuous", "homeassistant.core", "homeassistant.helpers.update_coordinator"]
+LAZY = ["bs4"]
+
+
+def import_once(module: str) -> tuple[float, dict[str, int]] | None:
+    """Import module in a new interpreter. Returns its cumulative import time in ms and the self time of every module it loaded."""
+    preload = "".join(f"\ntry:\n    import {name}\nexcept ImportError:\n    pass" for name in PRELOADED)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(ROOT), str(ROOT / "custom_components" / "ps3")])}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{preload}\nimport sys\nsys.stderr.write('--- start\\n')\nimport {module}"],
+        cwd = ROOT, env = env, capture_output = True, text = True
+    )
+    if result.returncode != 0:
+        return None
+
+    loaded = {}
+    cumulative = 0
+    for line in result.stderr.split("--- start\n", 1)[-1].splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        loaded[name] = int(self_us)
+        if name == module:
+            cumulative = int(cumulative_us)
+
+    return cumulative / 1000, loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("modules", nargs = "*", default = MODULES)
+    parser.add_argument("--rounds", type = int, default = 10)
+    parser.add_argument("--budget", type = float, help = "Maximum median import time per module in milliseconds")
+    parser.add_argument("--top", type = int, default = 5, help = "Number of slowest dependencies to list per module")
+    args = parser.parse_args()
+
+    ok = True
+    for module in args.modules:
+        runs = [import_once(module) for _ in range(args.rounds)]
+        if None in runs:
+            print(f"{module:<40}  skipped, cannot be imported here")
+            continue
+
+        median = statistics.median(cumulative for cumulative, _ in runs)
+        loaded = runs[-1][1]
+        eager = [name for name in loaded if name.split(".")[0] in LAZY]
+
+        line = f"{module:<40}  {median:>8.2f} ms  {len(loaded):>4} modules"
+        if args.budget is not None and median > args.budget:
+            line += "  OVER BUDGET"
+            ok = False
+        if eager:
+            line += f"  loads {', '.join(sorted({name.split('.')[0] for name in eager}))} eagerly"
+            ok = False
+        print(line)
+
+        for name, self_us in sorted(loaded.items(), key = lambda item: item[1], reverse = True)[:args.top]:
+            print(f"    {self_us / 1000:>8.2f} ms  {name}")
+
+    sys.exit(0 if ok else 1)
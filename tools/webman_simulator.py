@@ -0,0 +1,245 @@
+"""Local stand-in for the webMAN MOD web server of one or more PlayStation® 3 consoles.
+
+Serves the pages and commands used by the integration so PS3MAPIWrapper can be exercised
+without a real console, e.g.
+
+    python tools/webman_simulator.py --consoles 20 --games 500 --latency 0.05
+
+starts 20 consoles on 127.0.0.1:8300 up to 127.0.0.1:8319. The integration can be pointed to
+one of them by entering the address including the port, e.g. 127.0.0.1:8300.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import zlib
+from urllib.parse import unquote, unquote_plus
+
+from aiohttp import web
+
+FAN_MODE_LABELS = {'Dynamic': 'MAX', 'Manual': 'Manual', 'Auto': 'AUTO', 'SYSCON': 'SYSCON'}
+
+
+class SimulatedConsole:
+    """State and web server of a single simulated console. All attributes can be changed at runtime."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8300, games: int = 25, latency: float = 0.0,
+                 timeout_rate: float = 0.0, disconnect_rate: float = 0.0, seed: int | None = None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.timeout_rate = timeout_rate
+        self.disconnect_rate = disconnect_rate
+        self.cpu_temp = 58.0
+        self.rsx_temp = 54.0
+        self.fan_mode = 'Dynamic'
+        self.fan_speed = 35
+        self.target_temp = 68.0
+        self.firmware_version = "4.91 CEX"
+        self.mac_address = "00:1F:A7:{:02X}:{:02X}:{:02X}".format(*divmod(port, 256), port % 251)
+        self.games = {f"Game {index:04d}": f"/mount.ps3/dev_hdd0/PS3ISO/Game {index:04d}.iso" for index in range(games)}
+        self.mounted_gamefile = None
+        self.playing = False
+        self.playback_seconds = 0
+        self.notifications = []
+        self.buttons = []
+        self.requests = 0
+        self.images_served = 0
+        self._random = random.Random(seed)
+        self._runner = None
+        self._site = None
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def is_on(self) -> bool:
+        return self._site is not None
+
+    async def power_on(self):
+        if self._runner is None:
+            self._runner = web.AppRunner(self._create_app(), handle_signals = False)
+            await self._runner.setup()
+        if self._site is None:
+            self._site = web.TCPSite(self._runner, self.host, self.port)
+            await self._site.start()
+
+    async def power_off(self):
+        # Closing the listening socket makes the console unreachable, just like a real one that is turned off
+        if self._runner is not None:
+            await self._runner.cleanup()
+        self._runner = None
+        self._site = None
+
+    def _create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.timeout_rate and self._random.random() < self.timeout_rate:
+            await asyncio.sleep(3600)
+
+        if self.disconnect_rate and self._random.random() < self.disconnect_rate:
+            request.transport.close()
+            return web.Response()
+
+        if request.path.lower().endswith(('.png', '.jpg')):
+            self.images_served += 1
+            return web.Response(body = render_image(request.path), content_type = 'image/png')
+
+        # Everything after the first '?' is encoded as a query string, including chained actions
+        path, separator, query = request.raw_path.partition('?')
+        *leading, last = unquote(path).split(';')
+        first, *chained = query.split(';')
+        actions = leading + [last + separator + unquote_plus(first)] + [unquote_plus(action) for action in chained]
+
+        body = ""
+        # webMAN runs actions chained with ';' one after the other
+        for action in actions:
+            body = await self._run_action(action) or body
+
+        return web.Response(text = body, content_type = 'text/html', charset = 'utf-8')
+
+    async def _run_action(self, action: str) -> str | None:
+        path, _, query = action.partition('?')
+
+        if path == '/cpursx.ps3':
+            self._apply_fan_query(query)
+            return render_cpursx(self)
+        if path == '/index.ps3':
+            return render_index(self)
+        if path == '/popup.ps3':
+            self.notifications.append(query.split('&icon=')[0])
+        elif path == '/pad.ps3':
+            self.buttons.append(query)
+        elif path == '/play.ps3':
+            self.playing = self.mounted_gamefile is not None
+        elif path == '/xmb.ps3$exit':
+            self.playing = False
+            self.playback_seconds = 0
+        elif path == '/mount.ps3/unmount':
+            self.mounted_gamefile = None
+        elif path.startswith('/mount.ps3/'):
+            self.mounted_gamefile = path
+        elif path == '/shutdown.ps3':
+            asyncio.get_running_loop().call_later(0.1, lambda: asyncio.ensure_future(self.power_off()))
+        return None
+
+    def _apply_fan_query(self, query: str):
+        if query == 'fan=0':
+            self.fan_mode = 'SYSCON'
+        elif query == 'fan=2':
+            self.fan_mode = 'Auto'
+        elif query == 'man':
+            self.fan_mode = 'Manual'
+        elif query == 'mode':
+            self.fan_mode = 'Dynamic'
+        elif query.startswith('fan='):
+            self.fan_speed = int(float(query[4:]))
+        elif query.startswith('max='):
+            self.target_temp = float(query[4:])
+
+    def tick(self, seconds: int = 1):
+        """Advance the simulated playback time and let the temperatures drift."""
+        if self.playing:
+            self.playback_seconds += seconds
+        self.cpu_temp = round(min(85.0, max(40.0, self.cpu_temp + self._random.uniform(-1, 1))), 1)
+        self.rsx_temp = round(min(85.0, max(40.0, self.rsx_temp + self._random.uniform(-1, 1))), 1)
+
+
+def render_image(path: str) -> bytes:
+    # Only the signature is a real PNG, the rest tells the images apart
+    return b'\x89PNG\r\n\x1a\n' + path.encode() * 64
+
+
+def render_cpursx(console: SimulatedConsole) -> str:
+    """Render the cpursx.ps3 page with the markup the integration scrapes."""
+    if console.fan_mode == 'Dynamic':
+        temperature_text = f"CPU: {console.cpu_temp:.0f}°C (MAX: {console.target_temp:.0f}°C) RSX: {console.rsx_temp:.0f}°C"
+    else:
+        temperature_text = f"CPU: {console.cpu_temp:.0f}°C ({FAN_MODE_LABELS[console.fan_mode]}) RSX: {console.rsx_temp:.0f}°C"
+
+    session = ""
+    if console.playing:
+        name = next((name for name, link in console.games.items() if link == console.mounted_gamefile), "Unknown")
+        game_id = f"BLUS{zlib.crc32(name.encode()) % 100000:05d}"
+        hours, rest = divmod(console.playback_seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        session = (
+            '<span style="position:relative;top:-20px;"><h2>'
+            f'<a href="/search.ps3?{game_id}">{game_id}</a> '
+            f'<a href="/search.ps3?{name}">{name}</a>'
+            f'<a href="/mount.ps3"><img src="/dev_hdd0/game/{game_id}/ICON0.PNG" height="60"></a>'
+            '</h2></span>'
+            f'<label title="Play">&#9654;</label>{hours:02d}:{minutes:02d}:{seconds:02d}'
+        )
+
+    mounted = ""
+    if console.mounted_gamefile is not None:
+        mounted = f'<font size="3"><a href="/mount.ps3/dev_hdd0">/dev_hdd0</a> <a href="{console.mounted_gamefile}">{console.mounted_gamefile}</a></font>'
+
+    return (
+        '<!DOCTYPE html><html><head><title>wMM</title></head><body>'
+        f'<a class="s" href="/cpursx.ps3?up">{temperature_text}</a><br>'
+        f'<a class="s" href="/cpursx.ps3?mode">FAN SPEED: {console.fan_speed}%</a><br>'
+        f'{session}{mounted}<hr>'
+        f'<a class="s" href="/setup.ps3">Firmware : {console.firmware_version}</a><br>'
+        f'<label>MAC Addr : {console.mac_address} - LAN</label>'
+        '</body></html>'
+    )
+
+
+def render_index(console: SimulatedConsole) -> str:
+    """Render the index.ps3 game library page."""
+    entries = "".join(
+        f'<div class="gc"><div class="ic"><a href="{link}"><img src="/dev_hdd0/PS3ISO/{name}.PNG"></a></div>'
+        f'<div class="gn"><a href="{link}">{name}</a></div></div>'
+        for name, link in console.games.items()
+    )
+    return f'<!DOCTYPE html><html><head><title>wMM</title></head><body><div id="mg">{entries}</div></body></html>'
+
+
+async def start_consoles(count: int, host: str = "127.0.0.1", base_port: int = 8300, **kwargs) -> list[SimulatedConsole]:
+    consoles = [SimulatedConsole(host, base_port + index, seed = index, **kwargs) for index in range(count)]
+    await asyncio.gather(*(console.power_on() for console in consoles))
+    return consoles
+
+
+async def main(args):
+    consoles = await start_consoles(
+        args.consoles, args.host, args.base_port, games = args.games, latency = args.latency,
+        timeout_rate = args.timeout_rate, disconnect_rate = args.disconnect_rate
+    )
+    print(f"Simulating {len(consoles)} console(s) on {consoles[0].address} - {consoles[-1].address}")
+
+    try:
+        while True:
+            await asyncio.sleep(1)
+            for console in consoles:
+                console.tick()
+    finally:
+        await asyncio.gather(*(console.power_off() for console in consoles))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("--consoles", type = int, default = 1)
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--base-port", type = int, default = 8300)
+    parser.add_argument("--games", type = int, default = 25, help = "Size of the game library of each console")
+    parser.add_argument("--latency", type = float, default = 0.0, help = "Delay in seconds before each response")
+    parser.add_argument("--timeout-rate", type = float, default = 0.0, help = "Share of requests that never get a response")
+    parser.add_argument("--disconnect-rate", type = float, default = 0.0, help = "Share of requests whose connection is dropped")
+
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass